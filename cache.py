@@ -0,0 +1,107 @@
+"""
+Caches for the interactive preview: decoded sources, and rendered results
+keyed on (source, filter, params, region, scale).
+
+Both are LRUs capped by the bytes they hold. Cached arrays are made
+read-only, since every user shares them.
+"""
+import os
+import cv2
+import threading
+from collections import OrderedDict
+from cv2.typing import MatLike
+from typing import Any, Hashable, Tuple
+
+
+class LRUCache:
+    """
+    LRU of numpy arrays capped by their total nbytes. Thread safe.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[Hashable, MatLike] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> MatLike | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: MatLike) -> MatLike:
+        """
+        Stores value (made read-only) and returns it. Values bigger than
+        the whole budget are returned without being stored.
+        """
+
+        value.setflags(write=False)
+        if value.nbytes > self.max_bytes:
+            return value
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+
+            self._items[key] = value
+            self._bytes += value.nbytes
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+SOURCE_CACHE = LRUCache(max_bytes=1024 * 1024 * 1024)
+RENDER_CACHE = LRUCache(max_bytes=512 * 1024 * 1024)
+
+
+def source_key(path: str, flags: int = cv2.IMREAD_COLOR) -> Hashable:
+    'Identifies a decode of a file; changes when the file does'
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, flags)
+
+
+def imread_cached(path: str, flags: int = cv2.IMREAD_COLOR) -> Tuple[Hashable, MatLike | None]:
+    """
+    cv2.imread through SOURCE_CACHE.
+
+    Returns:
+        (source key, read-only image or None when it can't be read)
+    """
+
+    key = source_key(path, flags)
+    img = SOURCE_CACHE.get(key)
+    if img is None:
+        img = cv2.imread(path, flags)
+        if img is not None:
+            img = SOURCE_CACHE.put(key, img)
+    return key, img
+
+
+def render_key(
+    source: Hashable,
+    filter_name: str | None,
+    params: dict[str, Any],
+    rect: Tuple[int, int, int, int],
+    scale: float = 1.0
+) -> Hashable:
+    """
+    Key of a rendered region of a source. params are the ones actually
+    applied (Filters.scaled_params(scale)).
+    """
+
+    return (source, filter_name, tuple(sorted(params.items())), tuple(rect), scale)
@@ -0,0 +1,147 @@
+"""
+Headless renderer. Doesn't import tkinter or PIL, so it runs on machines
+without a display.
+
+Usage:
+    python cli.py render in.mp4 out.mp4 --filter warp --param curvature=30
+    python cli.py render a.mp4 b.jpg c.png --output-dir out/ --filter noise --jobs 8
+    python cli.py render scan.tif scan_warped.tif --filter warp   (out of core)
+    python cli.py cube look.cube --filter saturation --param intensity=30
+    python cli.py render in.mp4 out.mp4 --cube look.cube
+"""
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+from core import build_filters, render_file, render_file_cube, export_cube
+from export import EXPORT_MODES, ENCODERS
+
+
+def parse_params(pairs: List[str]) -> Dict[str, int]:
+    params = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got '{pair}'")
+        params[name.strip()] = int(value)
+    return params
+
+
+def render_job(
+    input_path: str,
+    output_path: str,
+    filter_name: str,
+    params: Dict[str, int],
+    seed: int,
+    video_options: Dict[str, Any]
+) -> str:
+    """
+    Worker entry point. Builds its own Filters, since it can't be pickled.
+    """
+
+    filters = build_filters(filter_name, params, seed=seed)
+    render_file(input_path, output_path, filters, **video_options)
+    return output_path
+
+
+def cube_job(input_path: str, output_path: str, cube_path: str) -> str:
+    'Worker entry point of render --cube'
+    render_file_cube(input_path, output_path, cube_path)
+    return output_path
+
+
+def resolve_jobs(paths: List[str], output_dir: str | None) -> List[Tuple[str, str]]:
+    if output_dir is None:
+        if len(paths) != 2:
+            raise SystemExit("render: expected INPUT OUTPUT, or use --output-dir with many inputs")
+        return [(paths[0], paths[1])]
+
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        (path, os.path.join(output_dir, os.path.basename(path)))
+        for path in paths
+    ]
+
+
+def cmd_render(args: argparse.Namespace) -> int:
+    if (args.filter is None) == (args.cube is None):
+        raise SystemExit("render: expected one of --filter or --cube")
+
+    params = parse_params(args.param)
+    jobs = resolve_jobs(args.paths, args.output_dir)
+    video_options = {"mode": args.mode, "workers": args.workers, "encoder": args.encoder}
+
+    # Validates filter/params before spawning any worker
+    if args.filter is not None:
+        build_filters(args.filter, params)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        if args.cube is not None:
+            futures = {pool.submit(cube_job, src, dst, args.cube): src for src, dst in jobs}
+        else:
+            futures = {
+                pool.submit(render_job, src, dst, args.filter, params, args.seed, video_options): src
+                for src, dst in jobs
+            }
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                print(f"{src} -> {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"{src}: {e}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+def cmd_cube(args: argparse.Namespace) -> int:
+    filters = build_filters(args.filter, parse_params(args.param))
+    try:
+        export_cube(filters, args.output, args.size)
+    except ValueError as e:
+        print(f"{args.filter}: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.filter} -> {args.output}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="VideoFilters headless renderer")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # region ----|1|---- render
+    render = sub.add_parser("render", help="Apply a filter to images/videos")
+    render.add_argument("paths", nargs="+", help="INPUT OUTPUT, or many inputs with --output-dir")
+    render.add_argument("--output-dir", "-o", default=None)
+    render.add_argument("--filter", "-f", default=None)
+    render.add_argument("--cube", default=None, metavar="PATH", help="Apply a .cube 3D LUT instead of a filter")
+    render.add_argument("--param", "-p", action="append", default=[], metavar="NAME=VALUE")
+    render.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="Files rendered at once")
+    render.add_argument("--mode", choices=EXPORT_MODES, default="pipelined", help="Video export mode (lut3d: saturation, warmth, contrast, gamma >= 70; other filters render pipelined)")
+    render.add_argument("--workers", "-w", type=int, default=None, help="Filter threads (processes with --mode chunked/shared) per video or out-of-core image")
+    render.add_argument("--encoder", choices=ENCODERS, default="ffmpeg", help="Video encoder")
+    render.add_argument("--seed", type=int, default=0, help="Seed for random filters (e.g. noise)")
+    render.set_defaults(func=cmd_render)
+    # endregion -|1|-
+
+    # region ----|1|---- cube
+    cube = sub.add_parser("cube", help="Export a colour filter as a 3D LUT (.cube): saturation, warmth, contrast or gamma >= 70")
+    cube.add_argument("output")
+    cube.add_argument("--filter", "-f", required=True)
+    cube.add_argument("--param", "-p", action="append", default=[], metavar="NAME=VALUE")
+    cube.add_argument("--size", type=int, default=65, help="Lattice points per axis")
+    cube.set_defaults(func=cmd_cube)
+    # endregion -|1|-
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
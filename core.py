@@ -0,0 +1,875 @@
+import os
+import cv2
+import copy
+import uuid
+import inspect
+import tempfile
+import subprocess
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from cv2.typing import MatLike
+from filters import *
+from filters.arena import Arena, output
+from filters.scanlines import scanlines_batch
+from typing import List, Callable, Dict, Any, Mapping
+from params_defs import PARAMS_DEFS
+from export import (
+    EXPORT_MODES,
+    ENCODERS,
+    FFmpegPipeWriter,
+    export_serial,
+    export_pipelined,
+    export_batched,
+    index_keyframes,
+    plan_segments,
+    preroll_start,
+    concat_segments,
+    export_lut3d
+)
+from filters.lut3d import bake_lut3d, write_cube, read_cube, apply_lut3d
+from frame_ring import export_shared
+from tiling import render_tiled
+from filters.plan import Rect
+from filters.region import REGION_KERNELS, array_reader, render_region
+from filters.temporal import TEMPORAL_KERNELS, FrameHistory
+from outofcore import LARGE_IMAGE_EXTENSIONS, render_banded
+
+
+VIDEO_EXTENSIONS = (".mp4", ".avi")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+BATCH_BLOCK_PIXELS = 1 << 18
+'Pixels per call when colour-only filters run over a stack of frames'
+BATCH_KERNELS: Dict[str, Callable[..., MatLike]] = {
+    "scanlines": scanlines_batch
+}
+'Filters with a dedicated NxHxWx3 kernel'
+COLOR_FILTERS = (
+    "original",
+    "saturation",
+    "warmth",
+    "contrast",
+    "gamma",
+    "posterize",
+    "bit_depth",
+    "banding",
+    "banding_luminance"
+)
+'Filters where each output pixel only depends on the same input pixel colour'
+LUT3D_FILTERS: Dict[str, Callable[[Mapping[str, int]], bool]] = {
+    "original": lambda params: True,
+    "saturation": lambda params: True,
+    "warmth": lambda params: True,
+    "contrast": lambda params: True,
+    # Steeper curves near black fall between lattice points
+    "gamma": lambda params: params["gamma"] >= 70
+}
+'''
+Colour filters a 65^3 3D LUT reproduces within 2 levels, and the params
+they do it at. The step quantizers (posterize, bit_depth, banding,
+banding_luminance) are 14 to 56 levels off: interpolation smooths their
+steps.
+'''
+TILED_MIN_PIXELS = 1 << 22
+'Stills at least this big are rendered in strips on all cores'
+TEMPORAL_MAX_GAP = 1.0
+'Seconds a stream may skip ahead (dropped preview frames) and keep its history'
+STILL_INDEX = 0
+'Frame index stills render as, seeding their random filters'
+FilterFn = Callable[..., MatLike]
+
+
+class Filters:
+    def __init__(self, seed: int = 0):
+        self.selected: None | str = None
+        self.seed = seed
+        'Base seed for random filters; combined with the frame index when one is given'
+
+        # region ----|1|---- Filter Params
+        self._params_defs = PARAMS_DEFS
+        self.params = {}
+
+        for filter_name in self._params_defs.keys():
+            param_registry = self._params_defs.get(filter_name, {})
+            self.params.setdefault(filter_name, {})
+            for param_name, cfg in param_registry.items():
+                self.params[filter_name][param_name] = cfg.default
+        # endregion -|1|-
+
+        # region ----|1|---- Define filters
+        self.filters: List[Callable] = (
+            original,
+            scanlines,
+            blur,
+            ca_linear,
+            ca_radial,
+            warp,
+            saturation,
+            warmth,
+            contrast,
+            vignette,
+            polaroid,
+            crt,
+            gamma,
+            noise,
+            posterize,
+            bit_depth,
+            downscale_resolution,
+            banding,
+            banding_luminance
+        )
+        self.t_filters: List[Callable] = (
+            vhs_tracking,
+            vhs_bleed,
+            vhs_ghosting,
+            vhs_blend
+        )
+        'Filters that work only with time'
+
+        self.fps = 30.0
+        'Frame rate of the stream; gives temporal filters their timestamps'
+        self.history: FrameHistory | None = None
+        'Past frames of the stream, for the selected temporal filter'
+        # endregion -|1|-
+
+        # region ----|1|---- Map filters
+        self.filters_map: dict[str, FilterFn] = {
+            func.__name__: func
+            for func in self.filters
+        }
+        self.t_filters_map: dict[str, FilterFn] = {
+            func.__name__: func
+            for func in self.t_filters
+        }
+        self.all_filters_map: dict[str, FilterFn] = self.filters_map | self.t_filters_map
+
+        self.seeded_filters = {
+            name
+            for name, func in self.all_filters_map.items()
+            if "rng" in inspect.signature(func).parameters
+        }
+        'Filters that take an `rng` (random generator) argument'
+        # endregion -|1|-
+
+    def set_param(
+            self,
+            filter_name: str,
+            param: str,
+            value: int,
+            frame: MatLike | None = None
+        ) -> None:
+        """
+        Sets a filter param clamped to its definition.
+
+        Bounds that depend on the frame are skipped when no frame is given.
+        """
+
+        cfg = self._params_defs[filter_name][param]
+
+        def resolve(v):
+            if callable(v):
+                return v(frame) if frame is not None else None
+            return v
+
+        min_v = resolve(cfg.min)
+        max_v = resolve(cfg.max)
+
+        if min_v is not None:
+            value = max(min_v, value)
+        if max_v is not None:
+            value = min(max_v, value)
+
+        self.params[filter_name][param] = value
+
+    def snapshot(self) -> "Filters":
+        """
+        Copy of the current selection and params that later set_param
+        calls don't affect, for renders running on another thread.
+        """
+
+        clone = copy.copy(self)
+        clone.params = {name: dict(params) for name, params in self.params.items()}
+        clone.history = None
+        return clone
+
+    def scaled_params(self, scale: float = 1.0) -> Dict[str, int]:
+        """
+        Params of the selected filter for a frame resized by scale: pixel
+        sizes (blur radius, shifts, spacing, noise sigmas, pixelation
+        blocks) follow the frame, clamped to their definition.
+        """
+
+        params = dict(self.params.get(self.selected) or {})
+        if scale == 1.0:
+            return params
+
+        for param, value in params.items():
+            cfg = self._params_defs[self.selected][param]
+            if cfg.rescale is None:
+                continue
+
+            value = cfg.rescale(value, scale)
+            if not callable(cfg.min):
+                value = max(cfg.min, value)
+            if not callable(cfg.max):
+                value = min(cfg.max, value)
+            params[param] = value
+
+        return params
+
+    def frame_rng(self, frame_index: int | None) -> np.random.Generator | None:
+        """
+        Generator for the selected filter at frame_index: seeded from
+        (seed, frame_index), or None (filter default) for non-random filters
+        or without an index.
+        """
+
+        if frame_index is None or self.selected not in self.seeded_filters:
+            return None
+        return np.random.default_rng(np.random.SeedSequence([self.seed, frame_index]))
+
+    @property
+    def temporal(self) -> bool:
+        'The selected filter reads past frames, so frames must come in order'
+        return self.selected in self.t_filters_map
+
+    def temporal_preroll(self) -> int:
+        """
+        Frames the selected filter must see before the first one of a
+        render that starts mid-stream (0 for filters without history).
+        """
+
+        if not self.temporal:
+            return 0
+        return TEMPORAL_KERNELS[self.selected].preroll(self.params[self.selected])
+
+    def frame_history(self, frame: MatLike, frame_index: int, params: Dict[str, int]) -> FrameHistory:
+        """
+        The history frame_index continues, (re)allocated when the filter,
+        its depth or the frame shape changes and reset when the stream
+        jumps back or too far ahead.
+        """
+
+        depth = TEMPORAL_KERNELS[self.selected].depth(params)
+        history = self.history
+
+        if (
+            history is None
+            or history.shape != frame.shape
+            or history.depth != depth
+            or history.name != self.selected
+        ):
+            history = self.history = FrameHistory(frame.shape, *depth, fps=self.fps, name=self.selected)
+        elif history.index >= 0 and not (
+            history.index <= frame_index <= history.index + TEMPORAL_MAX_GAP * self.fps
+        ):
+            history.reset()
+
+        history.fps = self.fps
+        return history
+
+    def apply_filter(
+            self,
+            frame: MatLike,
+            frame_index: int | None = None,
+            out: MatLike | None = None,
+            arena: Arena | None = None,
+            scale: float = 1.0
+        ) -> MatLike:
+        """
+        Applies the selected filter.
+
+        With a frame_index, random filters get a generator seeded from
+        (seed, frame_index), so the same frame always renders the same way
+        no matter which thread or process renders it.
+
+        out (same shape as frame, not aliasing it) receives the result and
+        arena provides temporaries; render loops keep both across frames.
+
+        scale: frame is the source resized by this factor (a proxy);
+        params with a size in pixels are rescaled to match (scaled_params).
+        """
+
+        filter_fn = self.all_filters_map[self.selected]
+        kwargs = self.scaled_params(scale)
+
+        if self.temporal:
+            return self._apply_temporal(frame, frame_index, kwargs, out, arena)
+
+        rng = self.frame_rng(frame_index)
+        if rng is not None:
+            kwargs["rng"] = rng
+        if out is not None:
+            kwargs["out"] = out
+        if arena is not None:
+            kwargs["arena"] = arena
+
+        if kwargs:
+            frame = filter_fn(frame, **kwargs)
+        else:
+            frame = filter_fn(frame)
+
+        return frame
+
+    def _apply_temporal(
+            self,
+            frame: MatLike,
+            frame_index: int | None,
+            params: Dict[str, int],
+            out: MatLike | None,
+            arena: Arena | None
+        ) -> MatLike:
+        """
+        Renders the next frame of the stream into the output ring of the
+        history; without a frame_index, the frame follows the last one.
+        """
+
+        if frame_index is None:
+            frame_index = self.history.index + 1 if self.history is not None else 0
+
+        history = self.frame_history(frame, frame_index, params)
+        slot = history.push(frame, frame_index)
+
+        kwargs = dict(params, history=history, out=slot, arena=arena)
+        rng = self.frame_rng(frame_index)
+        if rng is not None:
+            kwargs["rng"] = rng
+        self.all_filters_map[self.selected](frame, **kwargs)
+
+        # The slot is rewritten a few frames later; callers get their own
+        if out is None:
+            return slot.copy()
+        np.copyto(out, slot)
+        return out
+
+    def apply_batch(
+            self,
+            frames: MatLike,
+            first_index: int | None = None,
+            out: MatLike | None = None,
+            arena: Arena | None = None
+        ) -> MatLike:
+        """
+        Applies the selected filter to an NxHxWx3 contiguous stack of frames.
+
+        Colour-only filters see the stack as one (N*H)xWx3 frame and run
+        once; filters in BATCH_KERNELS run their stacked kernel; the rest
+        run frame by frame. first_index is the frame index of frames[0]
+        (see apply_filter).
+        """
+
+        out = output(out, frames)
+        n, h = frames.shape[:2]
+        params = self.params.get(self.selected) or {}
+
+        if self.selected in COLOR_FILTERS:
+            flat_shape = (n * h, *frames.shape[2:])
+            flat_frames = frames.reshape(flat_shape)
+            flat_out = out.reshape(flat_shape)
+
+            # Row blocks keep float temporaries cache sized however big the stack
+            rows = max(1, BATCH_BLOCK_PIXELS // frames.shape[2])
+            for y in range(0, n * h, rows):
+                self.apply_filter(flat_frames[y:y + rows], out=flat_out[y:y + rows], arena=arena)
+        elif self.selected in BATCH_KERNELS:
+            BATCH_KERNELS[self.selected](frames, **params, out=out, arena=arena)
+        else:
+            for i in range(n):
+                index = None if first_index is None else first_index + i
+                self.apply_filter(frames[i], index, out=out[i], arena=arena)
+
+        return out
+
+    def apply_region(
+            self,
+            frame: MatLike,
+            rect: Rect,
+            frame_index: int | None = None,
+            out: MatLike | None = None,
+            arena: Arena | None = None,
+            scale: float = 1.0
+        ) -> MatLike:
+        """
+        Applies the selected filter to the (y0, y1, x0, x1) rect of frame
+        only, reading just the source it depends on (see filters.region).
+        The result is the rect of apply_filter(frame); filters that need
+        the whole frame are applied to all of it and cropped.
+        """
+
+        name = self.selected
+        params = self.scaled_params(scale)
+        kernel = REGION_KERNELS.get(name)
+        y0, y1, x0, x1 = rect
+
+        if kernel is None:
+            result = self.apply_filter(frame, frame_index, arena=arena, scale=scale)[y0:y1, x0:x1]
+            if out is None:
+                return result
+            np.copyto(out, result)
+            return out
+
+        rng = self.frame_rng(frame_index)
+        state = kernel.prepare(frame.shape[:2], params, rng)
+
+        return render_region(
+            name,
+            self.all_filters_map[name],
+            params,
+            array_reader(frame),
+            frame.shape[:2],
+            rect,
+            state=state,
+            out=out,
+            arena=arena
+        )
+
+    def apply_tiled(
+            self,
+            frame: MatLike,
+            frame_index: int | None = None,
+            out: MatLike | None = None,
+            workers: int | None = None
+        ) -> MatLike:
+        """
+        Applies the selected filter in strips on a thread pool (see
+        tiling.render_tiled); same result as apply_filter, for big frames.
+        """
+
+        return render_tiled(
+            frame,
+            self.selected,
+            self.all_filters_map[self.selected],
+            self.params.get(self.selected) or {},
+            rng=self.frame_rng(frame_index),
+            workers=workers,
+            out=out
+        )
+
+
+def build_filters(
+    selected: str | None,
+    params: Dict[str, int] | None = None,
+    frame: MatLike | None = None,
+    seed: int = 0
+) -> Filters:
+    """
+    Builds a Filters instance with a selected filter and its params.
+
+    Used where a Filters object can't be shared (e.g. worker processes,
+    since PARAMS_DEFS holds lambdas and doesn't pickle).
+    """
+
+    filters = Filters(seed=seed)
+    filters.selected = selected
+
+    for param, value in (params or {}).items():
+        if param not in filters.params[selected]:
+            raise KeyError(f"Unknown param '{param}' for filter '{selected}'")
+        filters.set_param(selected, param, value, frame)
+
+    return filters
+
+
+def mux_audio(
+    video_no_audio: str, # path
+    original_video: str, # path
+    output_path: str # path
+) -> None:
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i", video_no_audio,
+        "-i", original_video,
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-map", "0:v:0",
+        "-map", "1:a:0?",
+        output_path
+    ]
+
+    subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def filter_still(filters: Filters, img: MatLike) -> MatLike:
+    """
+    Full-resolution render of a still; in strips on all cores when big.
+    Stills render as frame 0, so random filters follow the seed.
+    """
+
+    if img.shape[0] * img.shape[1] >= TILED_MIN_PIXELS:
+        return filters.apply_tiled(img, STILL_INDEX)
+    return filters.apply_filter(img, STILL_INDEX)
+
+
+def render_image(input_path: str, output_path: str, filters: Filters) -> None:
+    img = cv2.imread(input_path)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image: {input_path}")
+
+    img = filter_still(filters, img)
+
+    cv2.imwrite(output_path, img)
+
+
+def render_image_banded(
+    input_path: str,
+    output_path: str,
+    filters: Filters,
+    band_rows: int | None = None,
+    workers: int | None = None
+) -> None:
+    """
+    Renders an image out of core into a .npy or tiled TIFF (see outofcore):
+    peak memory stays at a few bands whatever the image size.
+    """
+
+    render_banded(
+        input_path,
+        output_path,
+        filters.selected,
+        filters.all_filters_map[filters.selected],
+        filters.params.get(filters.selected) or {},
+        rng=filters.frame_rng(STILL_INDEX),
+        band_rows=band_rows,
+        workers=workers
+    )
+
+
+def render_video(
+    input_path: str,
+    output_path: str,
+    filters: Filters,
+    mode: str = "pipelined",
+    workers: int | None = None,
+    encoder: str = "ffmpeg"
+) -> None:
+    """
+    Renders a filtered copy of a video, keeping the original audio.
+
+    mode:
+        "serial"    → decode, filter and encode in lockstep
+        "pipelined" → decode/filter/encode stages on separate threads
+        "chunked"   → keyframe-aligned segments rendered by worker processes
+                      (always encoded with ffmpeg)
+        "shared"    → worker processes filtering frames in a shared-memory ring
+        "batched"   → frames decoded and filtered in stacks of 16
+        "lut3d"     → smooth colour filters (LUT3D_FILTERS): baked to a .cube
+                      and applied by ffmpeg's lut3d (interpolated, within 2
+                      levels); other filters fall back to "pipelined"
+
+    Temporal filters need their frames in order: "pipelined" and "shared"
+    filter on a single thread (decode and encode still overlap with it),
+    and "chunked" segments pre-roll the frames before their start.
+
+    encoder:
+        "ffmpeg" → raw frames piped into a single ffmpeg process (x264 + audio)
+        "cv2"    → mp4v temp file, then mux_audio
+    """
+
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode '{mode}', expected one of {EXPORT_MODES}")
+    if encoder not in ENCODERS:
+        raise ValueError(f"Unknown encoder '{encoder}', expected one of {ENCODERS}")
+
+    if mode == "chunked":
+        render_video_chunked(input_path, output_path, filters, workers=workers)
+        return
+
+    if mode == "lut3d":
+        if lut3d_able(filters):
+            render_video_lut3d(input_path, output_path, filters)
+            return
+        mode = "pipelined"
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {input_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    filters.fps = fps or filters.fps
+    if filters.temporal:
+        # One filter stage, in frame order
+        if mode == "shared":
+            mode = "pipelined"
+        workers = 1
+
+    temp_path: str | None = None
+
+    if encoder == "ffmpeg":
+        writer = FFmpegPipeWriter(
+            output_path=output_path,
+            fps=fps,
+            frame_size=(w, h),
+            audio_source=input_path
+        )
+    else:
+        fourcc = cv2.VideoWriter_fourcc('m','p','4','v')
+
+        temp_path = f"{uuid.uuid4().hex}.mp4"
+
+        writer = cv2.VideoWriter(
+            filename=temp_path,
+            fourcc=fourcc,
+            fps=fps,
+            frameSize=(w, h)
+        )
+
+    try:
+        try:
+            if mode == "pipelined":
+                export_pipelined(cap, writer, filters.apply_filter, workers=workers)
+            elif mode == "batched":
+                export_batched(cap, writer, filters.apply_batch, frame_shape=(h, w, 3))
+            elif mode == "shared":
+                export_shared(
+                    cap,
+                    writer,
+                    filter_name=filters.selected,
+                    params=dict(filters.params.get(filters.selected) or {}),
+                    frame_shape=(h, w, 3),
+                    seed=filters.seed,
+                    workers=workers
+                )
+            else:
+                export_serial(cap, writer, filters.apply_filter)
+        finally:
+            cap.release()
+            writer.release()
+
+        if temp_path:
+            mux_audio(
+                video_no_audio=temp_path,
+                original_video=input_path,
+                output_path=output_path
+            )
+    finally:
+        # Delete temporary path
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def lut3d_able(filters: Filters) -> bool:
+    'The selected filter, with its current params, survives baking (LUT3D_FILTERS)'
+    able = LUT3D_FILTERS.get(filters.selected)
+    return able is not None and able(filters.params[filters.selected])
+
+
+def bake_filter_lut3d(filters: Filters, size: int = 65) -> MatLike:
+    """
+    Bakes the selected filter, with its current params, into a 3D LUT.
+    """
+
+    if not lut3d_able(filters):
+        raise ValueError(
+            f"Filter '{filters.selected}' with these params can't be baked into a 3D LUT "
+            f"(it isn't colour-only, or has steps interpolation would smooth)"
+        )
+
+    return bake_lut3d(filters.apply_filter, size)
+
+
+def export_cube(filters: Filters, output_path: str, size: int = 65) -> None:
+    write_cube(output_path, bake_filter_lut3d(filters, size), title=filters.selected)
+
+
+def render_video_lut3d(
+    input_path: str,
+    output_path: str,
+    filters: Filters,
+    size: int = 65
+) -> None:
+    """
+    Bakes a colour filter to a temporary .cube and lets ffmpeg apply it.
+    """
+
+    with tempfile.TemporaryDirectory(prefix="lut3d_") as tmp:
+        cube_path = os.path.join(tmp, "look.cube")
+        export_cube(filters, cube_path, size)
+        export_lut3d(input_path, output_path, cube_path)
+
+
+def apply_cube(img: MatLike, lut: MatLike, out: MatLike | None = None) -> MatLike:
+    'apply_lut3d in row blocks, so interpolation temporaries stay small'
+    out = output(out, img)
+    rows = max(1, BATCH_BLOCK_PIXELS // img.shape[1])
+    for y in range(0, img.shape[0], rows):
+        out[y:y + rows] = apply_lut3d(img[y:y + rows], lut)
+    return out
+
+
+def render_file_cube(input_path: str, output_path: str, cube_path: str) -> None:
+    """
+    Applies an imported .cube to an image (tetrahedral, in Python) or a
+    video (ffmpeg's lut3d, as the "lut3d" export mode does).
+    """
+
+    # Parsed up front, so a bad file fails the same way for both
+    lut = read_cube(cube_path)
+    ext = os.path.splitext(input_path)[1].lower()
+    out_ext = os.path.splitext(output_path)[1].lower()
+
+    if ext in LARGE_IMAGE_EXTENSIONS or out_ext in LARGE_IMAGE_EXTENSIONS:
+        raise ValueError(f"Out-of-core images can't take a .cube: {input_path}")
+    elif ext in IMAGE_EXTENSIONS:
+        img = cv2.imread(input_path)
+        if img is None:
+            raise FileNotFoundError(f"Could not read image: {input_path}")
+        cv2.imwrite(output_path, apply_cube(img, lut))
+    elif ext in VIDEO_EXTENSIONS:
+        export_lut3d(input_path, output_path, cube_path)
+    else:
+        raise ValueError(f"Unsupported file type: {input_path}")
+
+
+def render_segment(
+    input_path: str,
+    part_path: str,
+    start: int,
+    end: int,
+    filter_name: str,
+    params: Dict[str, int],
+    seed: int,
+    decode_from: int | None = None
+) -> int:
+    """
+    Worker entry point for chunked exports: renders frames [start, end)
+    into part_path, without audio.
+
+    decode_from: keyframe before start where decoding begins; frames up to
+    start are only filtered (pre-roll of temporal filters).
+    """
+
+    filters = build_filters(filter_name, params, seed=seed)
+    decode_from = start if decode_from is None else decode_from
+
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {input_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    filters.fps = fps or filters.fps
+
+    # decode_from is a keyframe, so seeking lands exactly on it
+    cap.set(cv2.CAP_PROP_POS_FRAMES, decode_from)
+
+    preroll_out = None
+    for index in range(decode_from, start):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        preroll_out = filters.apply_filter(frame, index, out=preroll_out)
+
+    writer = FFmpegPipeWriter(output_path=part_path, fps=fps, frame_size=(w, h))
+    try:
+        count = export_serial(
+            cap,
+            writer,
+            filters.apply_filter,
+            first_index=start,
+            max_frames=end - start
+        )
+    finally:
+        cap.release()
+        writer.release()
+
+    return count
+
+
+def render_video_chunked(
+    input_path: str,
+    output_path: str,
+    filters: Filters,
+    workers: int | None = None,
+    segments: int | None = None,
+    work_dir: str | None = None
+) -> None:
+    """
+    Renders a video as keyframe-aligned segments on a process pool.
+
+    Parts are joined with ffmpeg's concat demuxer (no re-encode) and then
+    muxed with the original audio. Frames are filtered with their global
+    index, so seeded filters match a serial render frame by frame, and
+    temporal filters pre-roll from an earlier keyframe (see
+    Filters.temporal_preroll).
+
+    Parameters:
+        workers  : worker processes (default: cpu count)
+        segments : number of segments (default: 4 per worker)
+        work_dir : where parts are written (default: next to output_path);
+                   can be a shared filesystem
+    """
+
+    workers = workers or os.cpu_count() or 1
+    segments = segments or 4 * workers
+
+    keyframes, total_frames = index_keyframes(input_path)
+    ranges = plan_segments(keyframes, total_frames, segments)
+    if not ranges:
+        raise ValueError(f"No video frames found in {input_path}")
+
+    filter_name = filters.selected
+    params = dict(filters.params.get(filter_name) or {})
+    preroll = filters.temporal_preroll()
+    ext = os.path.splitext(output_path)[1] or ".mp4"
+
+    work_dir = work_dir or os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(prefix="chunks_", dir=work_dir) as tmp:
+        part_paths = [
+            os.path.join(tmp, f"part_{i:05d}{ext}")
+            for i in range(len(ranges))
+        ]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    render_segment,
+                    input_path, part, start, end,
+                    filter_name, params, filters.seed,
+                    preroll_start(keyframes, start, preroll)
+                )
+                for part, (start, end) in zip(part_paths, ranges)
+            ]
+            for future in futures:
+                future.result()
+
+        joined_path = os.path.join(tmp, f"joined{ext}")
+        concat_segments(part_paths, joined_path)
+
+        mux_audio(
+            video_no_audio=joined_path,
+            original_video=input_path,
+            output_path=output_path
+        )
+
+
+def render_file(
+    input_path: str,
+    output_path: str,
+    filters: Filters,
+    **video_options: Any
+) -> None:
+    """
+    Renders an image or a video, picked by the input extension.
+
+    video_options are forwarded to render_video. Images read from or
+    written to .npy/.tif/.tiff are rendered out of core.
+    """
+
+    ext = os.path.splitext(input_path)[1].lower()
+    out_ext = os.path.splitext(output_path)[1].lower()
+    if ext in LARGE_IMAGE_EXTENSIONS or (ext in IMAGE_EXTENSIONS and out_ext in LARGE_IMAGE_EXTENSIONS):
+        render_image_banded(input_path, output_path, filters, workers=video_options.get("workers"))
+    elif ext in IMAGE_EXTENSIONS:
+        render_image(input_path, output_path, filters)
+    elif ext in VIDEO_EXTENSIONS:
+        render_video(input_path, output_path, filters, **video_options)
+    else:
+        raise ValueError(f"Unsupported file type: {input_path}")
@@ -0,0 +1,576 @@
+"""
+Frame loops used to export videos.
+
+Every loop reads from a cv2.VideoCapture-like object (`read()`) and writes
+to a cv2.VideoWriter-like object (`write(frame)`), so the decoder and the
+encoder can be swapped independently. Filters are called as
+`apply_filter(frame, frame_index)`, so seeded filters render the same frame
+the same way whichever loop (or process) runs it.
+"""
+import os
+import cv2
+import queue
+import threading
+import tempfile
+import subprocess
+import numpy as np
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from cv2.typing import MatLike
+from typing import Any, Callable
+from filters.arena import Arena
+
+
+EXPORT_MODES = ("serial", "pipelined", "chunked", "shared", "lut3d", "batched")
+ENCODERS = ("ffmpeg", "cv2")
+_END = None
+'Sentinel that marks the end of the decoded stream'
+
+
+FrameFilterFn = Callable[..., MatLike]
+'(frame, frame_index, out=None, arena=None) -> frame, like Filters.apply_filter'
+
+
+
+def export_serial(
+    cap: Any,
+    writer: Any,
+    apply_filter: FrameFilterFn,
+    first_index: int = 0,
+    max_frames: int | None = None
+) -> int:
+    """
+    Decodes, filters and encodes one frame at a time.
+
+    Parameters:
+        first_index : index of the first frame read from cap
+        max_frames  : stop after this many frames (default: until the end)
+
+    Returns:
+        Number of frames written.
+    """
+
+    # Output and temporaries are reused: the writer is done with a frame
+    # before the next one is filtered
+    arena = Arena()
+    out = None
+
+    count = 0
+    while max_frames is None or count < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if out is not None and out.shape != frame.shape:
+            out = None
+        out = apply_filter(frame, first_index + count, out=out, arena=arena)
+        writer.write(out)
+        count += 1
+
+    return count
+
+
+def export_batched(
+    cap: Any,
+    writer: Any,
+    apply_batch: Callable[..., MatLike],
+    frame_shape: tuple[int, ...],
+    batch_size: int = 16
+) -> int:
+    """
+    Decodes frames straight into a preallocated NxHxWx3 stack and filters
+    the whole stack per call, which amortizes per-frame Python overhead on
+    small (SD/480p) sources.
+
+    Parameters:
+        apply_batch : (frames, first_index, out=None, arena=None) -> frames,
+                      like Filters.apply_batch
+        frame_shape : (h, w, 3) of decoded frames
+
+    Returns:
+        Number of frames written.
+    """
+
+    frames = np.empty((batch_size, *frame_shape), dtype=np.uint8)
+    out = np.empty_like(frames)
+    arena = Arena()
+
+    count = 0
+    while True:
+        n = 0
+        while n < batch_size:
+            ret, frame = cap.read(frames[n])
+            if not ret:
+                break
+            if frame is not frames[n] and not np.shares_memory(frame, frames[n]):
+                frames[n] = frame
+            n += 1
+
+        if n == 0:
+            break
+
+        apply_batch(frames[:n], count, out=out[:n], arena=arena)
+        for i in range(n):
+            writer.write(out[i])
+        count += n
+
+        if n < batch_size:
+            break
+
+    return count
+
+
+def export_pipelined(
+    cap: Any,
+    writer: Any,
+    apply_filter: FrameFilterFn,
+    workers: int | None = None,
+    queue_size: int | None = None
+) -> int:
+    """
+    Runs decode, filter and encode as concurrent stages.
+
+    A decode thread reads frames and submits each one to a pool of filter
+    workers, pushing the resulting futures into a bounded queue in decode
+    order. The calling thread is the encoder: it pops futures in that same
+    order, so frames are written in order without any reordering buffer,
+    and the queue bound caps how many frames are in flight at once.
+
+    Filters spend most of their time inside cv2/NumPy calls that release
+    the GIL, so threads are enough to use several cores.
+
+    Parameters:
+        workers    : filter threads (default: cpu count)
+        queue_size : max frames in flight (default: 2 * workers)
+
+    Returns:
+        Number of frames written.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or 2 * workers
+
+    # Temporaries are reused per filter thread; outputs are not, since
+    # they wait in the queue until encoded
+    arenas = threading.local()
+
+    def filter_frame(frame: MatLike, index: int) -> MatLike:
+        if not hasattr(arenas, "arena"):
+            arenas.arena = Arena()
+        return apply_filter(frame, index, arena=arenas.arena)
+
+    pending: queue.Queue[Future | None] = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    decode_error: list[BaseException] = []
+
+    def put(item: Future | None) -> bool:
+        # Blocks while the queue is full, but gives up if the encoder stopped
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode(pool: ThreadPoolExecutor) -> None:
+        index = 0
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if not put(pool.submit(filter_frame, frame, index)):
+                    return
+                index += 1
+        except BaseException as e:
+            decode_error.append(e)
+        finally:
+            put(_END)
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="filter") as pool:
+        decoder = threading.Thread(target=decode, args=(pool,), name="decode", daemon=True)
+        decoder.start()
+
+        try:
+            while True:
+                future = pending.get()
+                if future is _END:
+                    break
+
+                writer.write(future.result())
+                count += 1
+        finally:
+            stop.set()
+            decoder.join()
+
+            # Drop frames that won't be written anymore
+            while not pending.empty():
+                future = pending.get_nowait()
+                if future is not _END:
+                    future.cancel()
+
+    if decode_error:
+        raise decode_error[0]
+
+    return count
+
+
+def index_keyframes(path: str) -> tuple[list[int], int]:
+    """
+    Finds the keyframes of the first video stream with ffprobe.
+
+    Reads packet headers only (no decoding). Packets come in decode order,
+    so each keyframe's display index is the rank of its pts among all
+    packets.
+
+    Returns:
+        (sorted keyframe indices, total frame count)
+    """
+
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts,flags",
+        "-of", "csv=p=0",
+        path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
+
+    all_pts = []
+    key_pts = []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if not pts or pts == "N/A":
+            continue
+        all_pts.append(int(pts))
+        if "K" in flags:
+            key_pts.append(int(pts))
+
+    all_pts.sort()
+    keyframes = sorted({bisect_left(all_pts, pts) for pts in key_pts})
+
+    return keyframes, len(all_pts)
+
+
+def plan_segments(
+    keyframes: list[int],
+    total_frames: int,
+    segments: int
+) -> list[tuple[int, int]]:
+    """
+    Splits [0, total_frames) into about `segments` ranges of similar length,
+    each starting on a keyframe.
+
+    Returns:
+        List of (start, end) frame ranges, end exclusive.
+    """
+
+    if total_frames <= 0:
+        return []
+
+    starts = [0]
+    target = total_frames / max(1, segments)
+    for i in range(1, segments):
+        # Keyframe closest to the ideal cut
+        cut = i * target
+        pos = bisect_left(keyframes, cut)
+        candidates = keyframes[max(0, pos - 1):pos + 1]
+        if not candidates:
+            continue
+        start = min(candidates, key=lambda k: abs(k - cut))
+        if starts[-1] < start < total_frames:
+            starts.append(start)
+
+    ends = starts[1:] + [total_frames]
+    return list(zip(starts, ends))
+
+
+def preroll_start(keyframes: list[int], start: int, preroll: int) -> int:
+    """
+    Keyframe to decode a segment from so that at least preroll frames come
+    before its start (temporal filters rebuild their history on them).
+    """
+
+    if preroll <= 0:
+        return start
+    pos = bisect_right(keyframes, start - preroll)
+    return keyframes[pos - 1] if pos else 0
+
+
+def concat_segments(part_paths: list[str], output_path: str) -> None:
+    """
+    Joins encoded parts without re-encoding (ffmpeg concat demuxer).
+    """
+
+    with tempfile.NamedTemporaryFile(
+        "w",
+        suffix=".txt",
+        dir=os.path.dirname(os.path.abspath(output_path)),
+        delete=False
+    ) as f:
+        for path in part_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+        list_path = f.name
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel", "error",
+        "-f", "concat",
+        "-safe", "0",
+        "-i", list_path,
+        "-c", "copy",
+        output_path
+    ]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    finally:
+        os.remove(list_path)
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg concat failed: {result.stderr.strip()}")
+
+
+def export_lut3d(
+    input_path: str,
+    output_path: str,
+    cube_path: str,
+    codec: str = "libx264",
+    crf: int = 18,
+    preset: str = "medium"
+) -> None:
+    """
+    Renders a colour grade entirely inside ffmpeg with its lut3d filter:
+    no frame goes through Python.
+    """
+
+    # Filter args are ":"-separated, so the path has to be escaped
+    escaped = cube_path.replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel", "error",
+        "-i", input_path,
+        "-map", "0:v:0",
+        "-map", "0:a:0?",
+        "-vf", f"lut3d=file={escaped}:interp=tetrahedral",
+        "-c:v", codec,
+        "-preset", preset,
+        "-crf", str(crf),
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac",
+        output_path
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg lut3d failed: {result.stderr.strip()}")
+
+
+class FFmpegPipeWriter:
+    """
+    cv2.VideoWriter-like writer that pipes raw BGR frames into one ffmpeg
+    process, which also takes the audio track from the original file.
+
+    Replaces the cv2 temp file + mux_audio pass: the video is encoded once,
+    straight to its final codec, and nothing is written besides the output.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: float,
+        frame_size: tuple[int, int],
+        audio_source: str | None = None,
+        codec: str = "libx264",
+        crf: int = 18,
+        preset: str = "medium"
+    ):
+        w, h = frame_size
+        self.frame_size = frame_size
+
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-s", f"{w}x{h}",
+            "-r", f"{fps}",
+            "-i", "-"
+        ]
+        if audio_source:
+            cmd += ["-i", audio_source]
+
+        cmd += ["-map", "0:v:0"]
+        if audio_source:
+            # "?" keeps sources without audio from failing
+            cmd += ["-map", "1:a:0?", "-c:a", "aac", "-shortest"]
+
+        cmd += [
+            "-c:v", codec,
+            "-preset", preset,
+            "-crf", str(crf),
+            "-pix_fmt", "yuv420p",
+            output_path
+        ]
+
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._stderr
+        )
+
+    def write(self, frame: MatLike) -> None:
+        h, w = frame.shape[:2]
+        if (w, h) != self.frame_size:
+            raise ValueError(f"Frame size {(w, h)} doesn't match writer size {self.frame_size}")
+
+        try:
+            self._proc.stdin.write(frame.tobytes() if not frame.flags.c_contiguous else frame.data)
+        except BrokenPipeError:
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg exited early: {self._error()}") from None
+
+    def release(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        code = self._proc.wait()
+        error = self._error()
+        self._stderr.close()
+
+        if code != 0:
+            raise RuntimeError(f"ffmpeg failed ({code}): {error}")
+
+    def _error(self) -> str:
+        if self._stderr.closed:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()
+
+
+class FFmpegPipeReader:
+    """
+    cv2.VideoCapture-like reader that decodes through an ffmpeg process,
+    optionally scaled to frame_size on the way out.
+
+    Used for previews: decoding and scaling run in ffmpeg, in parallel with
+    the caller, and full-size frames never reach Python.
+    """
+
+    def __init__(self, input_path: str, frame_size: tuple[int, int] | None = None):
+        probe = cv2.VideoCapture(input_path)
+        if not probe.isOpened():
+            raise FileNotFoundError(f"Could not open video: {input_path}")
+
+        self.input_path = input_path
+        self.fps = probe.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(probe.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.source_size = (
+            int(probe.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+        probe.release()
+
+        self.frame_size = frame_size or self.source_size
+        self._proc: subprocess.Popen | None = None
+        self._pos = 0
+        self._open(0)
+
+    def _open(self, start_frame: int) -> None:
+        w, h = self.frame_size
+
+        cmd = ["ffmpeg", "-loglevel", "error"]
+        if start_frame:
+            cmd += ["-ss", f"{start_frame / self.fps:.6f}"]
+        cmd += ["-i", self.input_path, "-an", "-sn"]
+        if self.frame_size != self.source_size:
+            cmd += ["-vf", f"scale={w}:{h}:flags=area"]
+        cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._pos = start_frame
+
+    def isOpened(self) -> bool:
+        return self._proc is not None
+
+    def read(self, image: MatLike | None = None) -> tuple[bool, MatLike | None]:
+        'Like cv2.VideoCapture.read, image is filled when given (h, w, 3 contiguous uint8)'
+        if self._proc is None:
+            return False, None
+
+        w, h = self.frame_size
+        frame = np.empty((h, w, 3), dtype=np.uint8) if image is None else image
+        view = memoryview(frame).cast("B")
+
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                return False, None
+            filled += n
+
+        self._pos += 1
+        return True, frame
+
+    def grab(self) -> bool:
+        'Skips a frame (ffmpeg still decodes it, but it never becomes an array)'
+        if self._proc is None:
+            return False
+
+        w, h = self.frame_size
+        size = w * h * 3
+        while size:
+            chunk = self._proc.stdout.read(min(size, 1 << 20))
+            if not chunk:
+                return False
+            size -= len(chunk)
+
+        self._pos += 1
+        return True
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+            cv2.CAP_PROP_FRAME_WIDTH: self.frame_size[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: self.frame_size[1],
+            cv2.CAP_PROP_POS_FRAMES: self._pos
+        }.get(prop, 0.0)
+
+    def set(self, prop: int, value: float) -> bool:
+        'Only seeking (CAP_PROP_POS_FRAMES) is supported; it restarts ffmpeg'
+        if prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+
+        self.release()
+        self._open(int(value))
+        return True
+
+    def release(self) -> None:
+        if self._proc is None:
+            return
+
+        self._proc.stdout.close()
+        self._proc.kill()
+        self._proc.wait()
+        self._proc = None
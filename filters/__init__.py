@@ -9,10 +9,12 @@ from .warmth import warmth
 from .contrast import contrast
 from .vignette import vignette
 from .polaroid import polaroid
+from .crt import crt
 from .gamma import gamma
 from .noise import noise
 from .posterize import posterize
 from .bit_depth import bit_depth
 from .downscale_resolution import downscale_resolution
 from .banding import banding
-from .banding_luminance import banding_luminance
\ No newline at end of file
+from .banding_luminance import banding_luminance
+from .vhs import vhs_tracking, vhs_bleed, vhs_ghosting, vhs_blend
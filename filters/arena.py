@@ -0,0 +1,62 @@
+import numpy as np
+from cv2.typing import MatLike
+from typing import Dict, Hashable, Tuple
+
+
+class Arena:
+    """
+    Scratch buffers reused across frames, keyed by (name, shape, dtype).
+
+    Filters take an optional arena and fetch their temporaries from it, so
+    a render loop that keeps one arena allocates each temporary only once.
+    Not thread safe: keep one arena per thread or worker.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[Hashable, MatLike] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: type = np.uint8) -> MatLike:
+        """
+        Returns an uninitialized buffer; contents are whatever the last
+        user of the same key left in it.
+        """
+
+        key = (name, tuple(shape), np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+        return buf
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    def clear(self) -> None:
+        self._buffers.clear()
+
+
+def scratch(
+    arena: Arena | None,
+    name: str,
+    shape: Tuple[int, ...],
+    dtype: type = np.uint8
+) -> MatLike:
+    'Buffer from the arena, or a fresh one without arena'
+    if arena is None:
+        return np.empty(shape, dtype=dtype)
+    return arena.get(name, shape, dtype)
+
+
+def output(out: MatLike | None, img: MatLike) -> MatLike:
+    """
+    Checks a caller-supplied destination, or allocates one like img.
+    """
+
+    if out is None:
+        return np.empty_like(img)
+    if out.shape != img.shape or out.dtype != img.dtype:
+        raise ValueError(
+            f"out has shape {out.shape}/{out.dtype}, expected {img.shape}/{img.dtype}"
+        )
+    return out
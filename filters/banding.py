@@ -1,13 +1,36 @@
+import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
 
-def banding(
+def _banding(
     img: MatLike,
     levels: int = 8
 ) -> MatLike:
+    """
+    Pointwise math, compiled into a LUT by banding_lut().
+    """
 
     step = 256 // levels
 
     out = (img // step) * step
     return out.astype(np.uint8)
+
+
+def banding_lut(levels: int) -> MatLike:
+    return compile_lut(_banding, levels=levels)
+
+
+def banding(
+    img: MatLike,
+    levels: int = 8,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Reduces the tonal levels per channel (values snap down to their band).
+    """
+
+    return cv2.LUT(img, banding_lut(levels=levels), dst=output(out, img))
@@ -1,21 +1,60 @@
 import numpy as np
 import cv2
+from functools import lru_cache
 from cv2.typing import MatLike
+from .arena import Arena, output, scratch
+
+
+HSV_TO_FLOAT = (2.0, 1 / 255, 1.0, 0.0)
+'Per-channel scale from uint8 HSV (H/2, S and V in 0-255) to float HSV'
+
+
+def banding_luminance_hsv(hsv_f: MatLike, levels: int, arena: Arena | None = None) -> MatLike:
+    """
+    In-place luminance banding on a float32 HSV image (V on the 0-255 scale).
+    """
+
+    step = 256 // levels
+
+    v = hsv_f[..., 2]
+    np.floor(v / step, out=v)
+    v *= step
+
+    return hsv_f
+
+
+@lru_cache(maxsize=64)
+def _v_band_lut(levels: int) -> MatLike:
+    'HSV → the same HSV with V snapped down to its band, as a cv2.LUT table'
+    step = 256 // levels
+    table = np.repeat(np.arange(256, dtype=np.uint8).reshape(256, 1, 1), 3, axis=2)
+    table[:, 0, 2] = (np.arange(256) // step) * step
+    return table
 
 
 def banding_luminance(
     img: MatLike,
-    levels: int = 8
+    levels: int = 8,
+    out: MatLike | None = None,
+    arena: Arena | None = None
 ) -> MatLike:
     """
     Increases banding focusing on luminance (HSV V channel).
+
+    HSV goes back to BGR in float32: cv2's uint8 HSV2BGR rounds SIMD lanes
+    and row tails differently, so its result depends on where a pixel sits
+    in the row, and a region or strip of the frame wouldn't match the same
+    crop of the whole frame (by one level).
     """
-    step = 256 // levels
 
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-    v = hsv[..., 2]
+    hsv = scratch(arena, "banding_luminance_hsv", img.shape)
+    cv2.cvtColor(img, cv2.COLOR_BGR2HSV, dst=hsv)
+    cv2.LUT(hsv, _v_band_lut(levels), dst=hsv)
 
-    v = (v // step) * step
-    hsv[..., 2] = v.astype(np.uint8)
+    # Float HSV is H in degrees, S in 0-1
+    hsv_f = scratch(arena, "banding_luminance_hsv_f", img.shape, np.float32)
+    cv2.multiply(hsv, HSV_TO_FLOAT, dst=hsv_f, dtype=cv2.CV_32F)
+    cv2.cvtColor(hsv_f, cv2.COLOR_HSV2BGR, dst=hsv_f)
 
-    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    # Rounded and saturated
+    return cv2.convertScaleAbs(hsv_f, dst=output(out, img))
@@ -1,20 +1,16 @@
+import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
 
-def bit_depth(
+def _bit_depth(
     img: MatLike,
     bits: int = 4
 ) -> MatLike:
     """
-    Reduces bit depth.
-
-    Parameters:
-        img  : uint8
-        bits : bits per channel (1-8)
-
-    Returns:
-        Image with given bit size
+    Pointwise math, compiled into a LUT by bit_depth_lut().
     """
 
     # Levels
@@ -29,4 +25,28 @@ def bit_depth(
     # Remap [0,255]
     img_out: MatLike = (img_quant * 255.0).astype(np.uint8)
 
-    return img_out
\ No newline at end of file
+    return img_out
+
+
+def bit_depth_lut(bits: int) -> MatLike:
+    return compile_lut(_bit_depth, bits=bits)
+
+
+def bit_depth(
+    img: MatLike,
+    bits: int = 4,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Reduces bit depth.
+
+    Parameters:
+        img  : uint8
+        bits : bits per channel (1-8)
+
+    Returns:
+        Image with given bit size
+    """
+
+    return cv2.LUT(img, bit_depth_lut(bits=bits), dst=output(out, img))
@@ -1,12 +1,94 @@
+"""
+Gaussian blur, exact or fast.
+
+The exact blur is cv2.GaussianBlur with a (2 * blur_intensity + 1) kernel,
+whose cost grows with the radius. The fast one stacks FAST_PASSES box
+blurs sized to the same sigma (Kovesi's widths): each box costs the same
+whatever its width, so the whole blur costs about the same at any radius.
+
+Against the exact blur on 8-bit frames, measured at every radius from
+FAST_MIN_RADIUS to 50 on a video frame, white noise, single dots and lines
+and checkerboards of 1 to 32 pixel squares, it's within FAST_MAX_ERROR
+levels per pixel. The mean difference is under half a level on the video
+frame and up to 2.5 levels on 1-2 pixel checkerboards (error sits at hard
+edges, where stacked boxes are slightly less smooth than a Gaussian).
+Three passes miss sigma by enough at some radii to break that bound (12
+levels at radius 5, 9 at 14). Smaller radii, where the exact blur is cheap
+and boxes are too coarse an approximation, always use the exact blur.
+"""
 import cv2
+import math
+from functools import lru_cache
 from cv2.typing import MatLike
+from .arena import Arena, output, scratch
+
+
+FAST_PASSES = 4
+'Box blurs stacked by the fast blur; fewer miss sigma by too much at small radii'
+FAST_MIN_RADIUS = 5
+'Smallest blur_intensity the fast blur approximates'
+FAST_MAX_ERROR = 8
+'Largest per-pixel difference from the exact blur, in levels'
+
+
+def _sigma(blur_intensity: int) -> float:
+    'Sigma cv2 derives for a (2 * blur_intensity + 1) kernel'
+    return 0.3 * blur_intensity + 0.5
+
+
+@lru_cache(maxsize=64)
+def box_sizes(blur_intensity: int) -> tuple[int, ...]:
+    """
+    Widths of the FAST_PASSES box blurs approximating the Gaussian of
+    blur_intensity: odd, and within 2 of each other.
+    """
+
+    sigma = _sigma(blur_intensity)
+    n = FAST_PASSES
+
+    # The widest odd width under the ideal one; the first m passes use it,
+    # the rest the next odd width, for a total variance of sigma²
+    ideal = math.sqrt(12 * sigma * sigma / n + 1)
+    lower = int(ideal) - (int(ideal) % 2 == 0)
+    m = round((12 * sigma * sigma - n * lower * lower - 4 * n * lower - 3 * n) / (-4 * lower - 4))
+    return tuple(lower if i < m else lower + 2 for i in range(n))
+
+
+def blur_radius(blur_intensity: int = 1, fast: int = 0) -> int:
+    'How far outside a pixel blur reads'
+    if fast and blur_intensity >= FAST_MIN_RADIUS:
+        return sum(size // 2 for size in box_sizes(blur_intensity))
+    return blur_intensity
+
 
 def blur(frame: MatLike,
-         blur_intensity: int = 1) -> MatLike:
+         blur_intensity: int = 1,
+         fast: int = 0,
+         out: MatLike | None = None,
+         arena: Arena | None = None) -> MatLike:
+    """
+    Gaussian blur of radius blur_intensity.
+
+    fast: stacked box blurs instead of the exact Gaussian, at a cost that
+    doesn't grow with the radius (see the module docstring for the error).
+    """
+
+    out = output(out, frame)
 
     # ksize: kernel size (size of influence)
     # ksize needs to be odd
 
-    ksize = (2 * blur_intensity) + 1
+    if not fast or blur_intensity < FAST_MIN_RADIUS:
+        ksize = (2 * blur_intensity) + 1
+        return cv2.GaussianBlur(frame, (ksize, ksize), 0, dst=out)
 
-    return cv2.GaussianBlur(frame, (ksize, ksize), 0)
\ No newline at end of file
+    # Alternates between two buffers, ending in out; the border rule is
+    # GaussianBlur's (reflect 101), so frame edges match too
+    sizes = box_sizes(blur_intensity)
+    temp = scratch(arena, "blur_box", frame.shape, frame.dtype)
+    src = frame
+    for i, size in enumerate(sizes):
+        dst = out if (len(sizes) - i) % 2 == 1 else temp
+        cv2.blur(src, (size, size), dst=dst, borderType=cv2.BORDER_REFLECT_101)
+        src = dst
+    return out
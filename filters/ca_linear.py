@@ -1,13 +1,39 @@
-import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .plan import Rect
+from .arena import Arena, output
+
+
+def ca_linear_maps(
+    shape: tuple[int, int],
+    shift_r: int,
+    shift_g: int,
+    shift_b: int,
+    rect: Rect | None = None
+) -> tuple:
+    """
+    Per-channel (map_x, map_y) remap equivalent of ca_linear, in BGR order,
+    for the output pixels in rect (default: whole frame).
+    """
+
+    h, w = shape
+    y0, y1, x0, x1 = rect or (0, h, 0, w)
+    x, y = np.meshgrid(np.arange(x0, x1, dtype=np.float32), np.arange(y0, y1, dtype=np.float32))
+
+    # warpAffine maps dst(x, y) = src(x - shift, y)
+    return tuple(
+        (x - np.float32(shift), y)
+        for shift in (shift_b, shift_g, shift_r)
+    )
 
 
 def ca_linear(
     img: MatLike,
     shift_r: int = 5,
     shift_g: int = 0,
-    shift_b: int = -5
+    shift_b: int = -5,
+    out: MatLike | None = None,
+    arena: Arena | None = None
 ) -> MatLike:
     """
     Applies a chromatic aberration effect by shifting color channels independently.
@@ -23,28 +49,20 @@ def ca_linear(
     """
 
     h, w = img.shape[:2]
+    out = output(out, img)
 
-    # Split BGR channels
-    b, g, r = cv2.split(img)
-
-    def shift_channel(channel: MatLike, shift: int) -> MatLike:
-        """
-        Move pixels of the channel by given shift value
-
-        :param channel:
-        :type channel: MatLike
-        :param shift:
-        :type shift: int
-        :return:
-        :rtype: MatLike
-        """
-
-        M = np.float32([[1, 0, shift], # shift here makes horizontal shift
-                        [0, 1, 0]]) # instead, shift here makes vertical shift
-        return cv2.warpAffine(channel, M, (w, h))
+    # Integer shifts are exact pixel copies (what warpAffine does with an
+    # integer translation), so plain slicing does it without temporaries
+    for c, shift in enumerate((shift_b, shift_g, shift_r)):
+        src = img[:, :, c]
+        dst = out[:, :, c]
+        s = min(abs(shift), w)
 
-    b_shifted = shift_channel(b, shift_b)
-    g_shifted = shift_channel(g, shift_g)
-    r_shifted = shift_channel(r, shift_r)
+        if shift >= 0:
+            dst[:, s:] = src[:, :w - s]
+            dst[:, :s] = 0
+        else:
+            dst[:, :w - s] = src[:, s:]
+            dst[:, w - s:] = 0
 
-    return cv2.merge((b_shifted, g_shifted, r_shifted))
\ No newline at end of file
+    return out
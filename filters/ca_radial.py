@@ -1,39 +1,62 @@
 import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .plan import FilterPlan, Rect, get_plan
+from .arena import Arena, output, scratch
 
 
-def ca_radial(
+def remap_channels(
     img: MatLike,
-    strength_r: int = 2,
-    strength_g: int = 0,
-    strength_b: int = -2
+    maps: tuple,
+    out: MatLike,
+    arena: Arena | None = None
 ) -> MatLike:
     """
-    Applies a radial chromatic aberration effect.
+    Remaps each BGR channel with its own (map_x, map_y) into out.
 
-    Each color channel is displaced radially from the image center
-    with a different strength, simulating real lens chromatic aberration.
+    out has the shape of the maps, which may differ from img's (when img
+    is only the part of a frame the maps read from).
+    """
 
-    Parameters:
-        img (MatLike): Input image in BGR format.
-        strength_r (float): Radial strength for the red channel.
-        strength_g (float): Radial strength for the green channel.
-        strength_b (float): Radial strength for the blue channel.
+    src = scratch(arena, "remap_src", img.shape[:2])
+    dst = [
+        scratch(arena, f"remap_dst{c}", maps[c][0].shape)
+        for c in range(len(maps))
+    ]
+
+    for c, (map_x, map_y) in enumerate(maps):
+        cv2.extractChannel(img, c, dst=src)
+        cv2.remap(
+            src,
+            map_x,
+            map_y,
+            dst=dst[c],
+            interpolation=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0
+        )
+
+    return cv2.merge(dst, dst=out)
 
-    Returns:
-        MatLike: Image with radial chromatic aberration applied.
-    """
 
-    strength_r = strength_r / 100.0
-    strength_g = strength_g / 100.0
-    strength_b = strength_b / 100.0
+def ca_radial_maps(
+    shape: tuple[int, int],
+    strength_r: int,
+    strength_g: int,
+    strength_b: int,
+    rect: Rect | None = None
+) -> tuple:
+    """
+    Per-channel (BGR) source coordinates of the radial aberration, for the
+    output pixels in rect (default: whole frame) of a frame of that shape.
+    """
 
-    h, w = img.shape[:2]
+    h, w = shape
+    y0, y1, x0, x1 = rect or (0, h, 0, w)
     cx, cy = w * 0.5, h * 0.5
 
     # Create normalized coordinate grid
-    x, y = np.meshgrid(np.arange(w), np.arange(h))
+    x, y = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1))
     x = x.astype(np.float32)
     y = y.astype(np.float32)
 
@@ -44,12 +67,9 @@ def ca_radial(
     max_radius = np.sqrt(cx * cx + cy * cy)
     radius = np.sqrt(dx * dx + dy * dy) / max_radius
 
-    # Split channels
-    b, g, r = cv2.split(img)
-
-    def remap_channel(channel: MatLike, strength: float) -> MatLike:
+    def channel_maps(strength: float) -> tuple[MatLike, MatLike]:
         """
-        Applies radial displacement to a single channel using remap.
+        Radial displacement maps of a single channel.
         """
 
         factor = 1.0 + strength * radius
@@ -57,17 +77,73 @@ def ca_radial(
         map_x:np.float64 = cx + dx * factor
         map_y:np.float64 = cy + dy * factor
 
-        return cv2.remap(
-            channel,
-            map_x.astype(np.float32),
-            map_y.astype(np.float32),
-            interpolation=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=0
-        )
+        return map_x.astype(np.float32), map_y.astype(np.float32)
+
+    # BGR order
+    return tuple(
+        channel_maps(strength / 100.0)
+        for strength in (strength_b, strength_g, strength_r)
+    )
 
-    b_shifted = remap_channel(b, strength_b)
-    g_shifted = remap_channel(g, strength_g)
-    r_shifted = remap_channel(r, strength_r)
 
-    return cv2.merge((b_shifted, g_shifted, r_shifted))
+class CARadialPlan(FilterPlan):
+    def __init__(
+        self,
+        shape: tuple[int, int],
+        strength_r: int,
+        strength_g: int,
+        strength_b: int
+    ):
+        super().__init__(shape, strength_r=strength_r, strength_g=strength_g, strength_b=strength_b)
+
+        self.maps = ca_radial_maps(shape, strength_r, strength_g, strength_b)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(m.nbytes for pair in self.maps for m in pair)
+
+    @property
+    def channel_maps(self) -> tuple:
+        return self.maps
+
+    def execute(
+        self,
+        img: MatLike,
+        out: MatLike | None = None,
+        arena: Arena | None = None
+    ) -> MatLike:
+        return remap_channels(img, self.maps, output(out, img), arena)
+
+
+def ca_radial(
+    img: MatLike,
+    strength_r: int = 2,
+    strength_g: int = 0,
+    strength_b: int = -2,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Applies a radial chromatic aberration effect.
+
+    Each color channel is displaced radially from the image center
+    with a different strength, simulating real lens chromatic aberration.
+
+    Parameters:
+        img (MatLike): Input image in BGR format.
+        strength_r (float): Radial strength for the red channel.
+        strength_g (float): Radial strength for the green channel.
+        strength_b (float): Radial strength for the blue channel.
+
+    Returns:
+        MatLike: Image with radial chromatic aberration applied.
+    """
+
+    plan = get_plan(
+        CARadialPlan,
+        img.shape,
+        strength_r=strength_r,
+        strength_g=strength_g,
+        strength_b=strength_b
+    )
+    return plan.execute(img, out, arena)
@@ -0,0 +1,92 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from typing import Callable, Dict, Sequence, Tuple
+from .arena import Arena, output, scratch
+from .saturation import saturation_f
+from .warmth import warmth_f
+from .contrast import contrast_f
+from .vignette import vignette_f
+from .banding_luminance import banding_luminance_hsv
+
+
+Stage = Tuple[str, Dict[str, int]]
+'(filter name, params)'
+
+# Filter name → (working colour space, in-place float32 kernel)
+FLOAT_KERNELS: Dict[str, Tuple[str, Callable[..., MatLike]]] = {
+    "saturation": ("bgr", saturation_f),
+    "warmth": ("bgr", warmth_f),
+    "contrast": ("bgr", contrast_f),
+    "vignette": ("bgr", vignette_f),
+    "banding_luminance": ("hsv", banding_luminance_hsv)
+}
+
+# Kernels whose result depends on where the pixel is in the frame
+POSITIONAL_KERNELS = frozenset({"vignette"})
+
+# cv2 float conversions keep V on the input's 0-255 scale (H in degrees)
+_CONVERSIONS = {
+    ("bgr", "hsv"): cv2.COLOR_BGR2HSV,
+    ("hsv", "bgr"): cv2.COLOR_HSV2BGR
+}
+
+
+def composite(
+    img: MatLike,
+    stages: Sequence[Stage],
+    out: MatLike | None = None,
+    arena: Arena | None = None,
+    origin: tuple[int, int] = (0, 0),
+    frame_shape: tuple[int, int] | None = None
+) -> MatLike:
+    """
+    Runs a stack of colour filters on one float32 working image.
+
+    The frame is converted to float once, and is only converted to another
+    colour space when consecutive stages need it. BGR stages are clipped
+    to 0-255 in place, as each uint8 filter clips its output, so the look
+    matches the filters applied one after another (within a few levels).
+    Quantization happens once, at the end, which is both cheaper and more
+    precise than chaining the uint8 filters.
+
+    Parameters:
+        img    : BGR uint8 image
+        stages : (filter name, params) in application order; names from
+                 FLOAT_KERNELS
+        origin, frame_shape : position of img when it is a patch of a
+                 larger frame, for the position-dependent kernels
+    """
+
+    work = scratch(arena, "composite_bgr", img.shape, np.float32)
+    np.copyto(work, img)
+    space = "bgr"
+
+    def convert(to_space: str) -> MatLike:
+        dst = scratch(arena, f"composite_{to_space}", img.shape, np.float32)
+        return cv2.cvtColor(work, _CONVERSIONS[(space, to_space)], dst=dst)
+
+    for name, params in stages:
+        stage_space, kernel = FLOAT_KERNELS[name]
+
+        if stage_space != space:
+            work = convert(stage_space)
+            space = stage_space
+
+        if name in POSITIONAL_KERNELS:
+            work = kernel(work, **params, arena=arena, origin=origin, frame_shape=frame_shape)
+        else:
+            work = kernel(work, **params, arena=arena)
+
+        # Highlights pushed past 255 stay there, like the uint8 filters;
+        # this also keeps HSV conversions on non-negative BGR
+        if space == "bgr":
+            np.clip(work, 0, 255, out=work)
+
+    if space != "bgr":
+        work = convert("bgr")
+
+    np.clip(work, 0, 255, out=work)
+    out = output(out, img)
+    np.copyto(out, work, casting="unsafe")
+    return out
@@ -1,15 +1,13 @@
+import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
 
-def contrast(img: MatLike, intensity: int) -> MatLike:
+def _contrast(img: MatLike, intensity: int) -> MatLike:
     """
-    Adjusts image contrast.
-
-    intensity (int):
-        -100 → very low contrast
-           0 → original
-        +100 → very high contrast
+    Pointwise math, compiled into a LUT by contrast_lut().
     """
 
     # Normalize to [-1.0, +1.0]
@@ -29,3 +27,40 @@ def contrast(img: MatLike, intensity: int) -> MatLike:
 
     # Clamp and convert back
     return np.clip(result, 0, 255).astype(np.uint8)
+
+
+def contrast_f(img_f: MatLike, intensity: int, arena: Arena | None = None) -> MatLike:
+    """
+    In-place contrast on a float32 BGR image (0-255 scale, unclipped).
+    """
+
+    factor = 1.0 + intensity / 100.0
+    pivot = 128.0
+
+    img_f -= pivot
+    img_f *= factor
+    img_f += pivot
+
+    return img_f
+
+
+def contrast_lut(intensity: int) -> MatLike:
+    return compile_lut(_contrast, intensity=intensity)
+
+
+def contrast(
+    img: MatLike,
+    intensity: int,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Adjusts image contrast.
+
+    intensity (int):
+        -100 → very low contrast
+           0 → original
+        +100 → very high contrast
+    """
+
+    return cv2.LUT(img, contrast_lut(intensity=intensity), dst=output(out, img))
@@ -0,0 +1,35 @@
+from cv2.typing import MatLike
+from .lens import lens
+from .scanlines import scanlines
+from .arena import Arena
+
+def crt(
+    img: MatLike,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Apply CRT filter to given image
+
+    Lens aberrations and screen curvature are resampled in one pass,
+    then scanlines are drawn over the curved screen.
+
+    :param img: BGR image
+    :type img: MatLike
+    :return:
+    :rtype: MatLike
+    """
+
+    CA_RADIAL = {"strength_r": 2, "strength_g": 0, "strength_b": -2}
+    CA_LINEAR = {"shift_r": 1, "shift_g": 0, "shift_b": -1}
+    CURVATURE = 30
+    SCANLINES = 30
+
+    out = lens(img, (
+        ("ca_radial", CA_RADIAL),
+        ("ca_linear", CA_LINEAR),
+        ("warp", {"curvature": CURVATURE})
+    ), out=out, arena=arena)
+
+    # In place over the lens output
+    return scanlines(out, intensity=SCANLINES, spacing=2, out=out)
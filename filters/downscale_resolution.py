@@ -1,15 +1,44 @@
 import numpy as np
 import cv2
 from cv2.typing import MatLike
+from .arena import Arena, output, scratch
+
+
+def downscale_maps(shape: tuple[int, int], scale_percent: int) -> tuple:
+    """
+    Remap approximation of downscale_resolution: every output pixel reads
+    the centre of its block (point sampling instead of INTER_AREA).
+
+    Returns:
+        (map_x, map_y) for each BGR channel
+    """
+
+    h, w = shape
+
+    new_w = max(1, int(w * scale_percent / 100))
+    new_h = max(1, int(h * scale_percent / 100))
+
+    def axis(size: int, new_size: int) -> MatLike:
+        # INTER_NEAREST upscale picks floor(x * new / old) in the small image
+        small = np.minimum(np.arange(size) * new_size // size, new_size - 1)
+        return ((small + 0.5) * size / new_size - 0.5).astype(np.float32)
+
+    map_x, map_y = np.meshgrid(axis(w, new_w), axis(h, new_h))
+    return ((map_x, map_y),) * 3
 
 
 def downscale_resolution(
         img: MatLike,
-        scale_percent: int
+        scale_percent: int,
+        out: MatLike | None = None,
+        arena: Arena | None = None
 ) -> MatLike:
 
+    out = output(out, img)
+
     if scale_percent == 100:
-        return img
+        np.copyto(out, img)
+        return out
 
     h, w = img.shape[:2]
 
@@ -18,10 +47,9 @@ def downscale_resolution(
 
     # Downscale
     INTERPOLATION_DOWN = cv2.INTER_AREA
-    small = cv2.resize(img, (new_w, new_h), interpolation=INTERPOLATION_DOWN)
+    small = scratch(arena, "downscale_small", (new_h, new_w, *img.shape[2:]))
+    cv2.resize(img, (new_w, new_h), dst=small, interpolation=INTERPOLATION_DOWN)
 
     # Upscale back (Pixelize)
     INTERPOLATION_UP = cv2.INTER_NEAREST
-    degraded = cv2.resize(small, (w, h), interpolation=INTERPOLATION_UP)
-
-    return degraded
\ No newline at end of file
+    return cv2.resize(small, (w, h), dst=out, interpolation=INTERPOLATION_UP)
\ No newline at end of file
@@ -1,13 +1,12 @@
+import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
-def gamma(img: MatLike, gamma: int) -> MatLike:
+def _gamma(img: MatLike, gamma: int) -> MatLike:
     """
-    Adjusts gamma equally in all pixels.
-
-    Default: 100.
-    Min: 0.
-    Max: 100.
+    Pointwise math, compiled into a LUT by gamma_lut().
     """
 
     # Exponent
@@ -23,3 +22,24 @@ def gamma(img: MatLike, gamma: int) -> MatLike:
     out = (out_norm * 255).astype(np.uint8)
 
     return out
+
+
+def gamma_lut(gamma: int) -> MatLike:
+    return compile_lut(_gamma, gamma=gamma)
+
+
+def gamma(
+    img: MatLike,
+    gamma: int,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Adjusts gamma equally in all pixels.
+
+    Default: 100.
+    Min: 0.
+    Max: 100.
+    """
+
+    return cv2.LUT(img, gamma_lut(gamma=gamma), dst=output(out, img))
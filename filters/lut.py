@@ -0,0 +1,35 @@
+import numpy as np
+from functools import lru_cache
+from cv2.typing import MatLike
+from typing import Callable
+
+
+# Every uint8 value on every BGR channel, as a 256x1x3 image
+RAMP: MatLike = np.repeat(
+    np.arange(256, dtype=np.uint8).reshape(256, 1, 1),
+    3,
+    axis=2
+)
+RAMP.setflags(write=False)
+
+
+@lru_cache(maxsize=512)
+def compile_lut(kernel: Callable[..., MatLike], **params) -> MatLike:
+    """
+    Compiles a pointwise kernel into a cv2.LUT table.
+
+    The kernel is run once over RAMP, so the table holds exactly what the
+    kernel would output for each uint8 value of each channel. Tables are
+    cached by (kernel, params).
+
+    Parameters:
+        kernel : function (img, **params) -> uint8 img, that maps every
+                 channel value independently
+    Returns:
+        256x1x3 uint8 table (read-only)
+    """
+
+    table = np.ascontiguousarray(kernel(RAMP.copy(), **params), dtype=np.uint8)
+    table.setflags(write=False)
+    return table
+
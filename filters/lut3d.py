@@ -0,0 +1,167 @@
+import numpy as np
+from cv2.typing import MatLike
+from typing import Callable
+
+
+def lattice_image(size: int) -> MatLike:
+    """
+    Builds a (size^3)x1x3 uint8 BGR image holding every lattice point, with
+    r varying fastest, then g, then b.
+
+    Lattice coordinates i * 255 / (size - 1) are rounded to uint8, since
+    filters only take uint8 input (off by at most 0.5 on the 0-255 scale).
+    """
+
+    axis = np.rint(np.linspace(0.0, 255.0, size)).astype(np.uint8)
+    b, g, r = np.meshgrid(axis, axis, axis, indexing="ij")
+
+    return np.stack((b, g, r), axis=-1).reshape(-1, 1, 3)
+
+
+def bake_lut3d(fn: Callable[[MatLike], MatLike], size: int = 33) -> MatLike:
+    """
+    Samples a colour-only filter on a size^3 lattice.
+
+    Only valid for filters where each output pixel depends on the colour of
+    the same input pixel (no neighbours, no position).
+
+    Parameters:
+        fn   : filter (img) -> img
+        size : lattice points per axis (33 or 65 are typical)
+    Returns:
+        float32 table lut[b, g, r] -> output BGR (0-255)
+    """
+
+    out = fn(lattice_image(size))
+    return np.asarray(out, dtype=np.float32).reshape(size, size, size, 3)
+
+
+def apply_lut3d(img: MatLike, lut: MatLike, method: str = "tetrahedral") -> MatLike:
+    """
+    Applies a 3D LUT to a BGR uint8 image.
+
+    Parameters:
+        lut    : table from bake_lut3d / read_cube
+        method : "trilinear" (8 lattice points) or "tetrahedral" (4 points,
+                 same interpolation as ffmpeg's lut3d default)
+    Returns:
+        uint8 image
+    """
+
+    if method not in ("trilinear", "tetrahedral"):
+        raise ValueError(f"Unknown interpolation '{method}'")
+
+    size = lut.shape[0]
+    flat = np.ascontiguousarray(lut, dtype=np.float32).reshape(-1, 3)
+
+    # Per-value lattice cell and weight, as 256-entry tables
+    pos = np.arange(256, dtype=np.float32) * ((size - 1) / 255.0)
+    cell = np.minimum(pos.astype(np.intp), size - 2)
+    frac = (pos - cell).astype(np.float32)
+
+    shape = img.shape
+    pixels = img.reshape(-1, 3)
+    b, g, r = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+
+    # Flat offsets of the +1 step on each axis
+    sb, sg, sr = size * size, size, 1
+    base = cell[b] * sb + cell[g] * sg + cell[r] * sr
+    fb, fg, fr = frac[b][:, None], frac[g][:, None], frac[r][:, None]
+
+    if method == "trilinear":
+        c000 = flat[base]
+        c001 = flat[base + sr]
+        c010 = flat[base + sg]
+        c011 = flat[base + sg + sr]
+        c100 = flat[base + sb]
+        c101 = flat[base + sb + sr]
+        c110 = flat[base + sb + sg]
+        c111 = flat[base + sb + sg + sr]
+
+        c00 = c000 + (c001 - c000) * fr
+        c01 = c010 + (c011 - c010) * fr
+        c10 = c100 + (c101 - c100) * fr
+        c11 = c110 + (c111 - c110) * fr
+        c0 = c00 + (c01 - c00) * fg
+        c1 = c10 + (c11 - c10) * fg
+        out = c0 + (c1 - c0) * fb
+    else:
+        # Walk from the cell origin to its far corner, one axis at a time,
+        # taking axes by decreasing fraction: that path picks the tetrahedron
+        fracs = np.concatenate((fb, fg, fr), axis=1)
+        steps = np.array((sb, sg, sr), dtype=np.intp)
+        order = np.argsort(-fracs, axis=1, kind="stable")
+        f_sorted = np.take_along_axis(fracs, order, axis=1)
+
+        i1 = base + steps[order[:, 0]]
+        i2 = i1 + steps[order[:, 1]]
+        i3 = base + sb + sg + sr
+
+        f0, f1, f2 = f_sorted[:, 0:1], f_sorted[:, 1:2], f_sorted[:, 2:3]
+        out = (
+            flat[base] * (1.0 - f0)
+            + flat[i1] * (f0 - f1)
+            + flat[i2] * (f1 - f2)
+            + flat[i3] * f2
+        )
+
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8).reshape(shape)
+
+
+def write_cube(path: str, lut: MatLike, title: str | None = None) -> None:
+    """
+    Writes a table as an Adobe/Resolve .cube file (RGB, 0-1 domain),
+    usable by ffmpeg's lut3d filter.
+    """
+
+    size = lut.shape[0]
+    # .cube wants r fastest, which is the C order of lut[b, g, r]
+    rgb = (lut[..., ::-1].reshape(-1, 3) / 255.0).clip(0.0, 1.0)
+
+    with open(path, "w") as f:
+        if title:
+            f.write(f'TITLE "{title}"\n')
+        f.write(f"LUT_3D_SIZE {size}\n")
+        f.write("DOMAIN_MIN 0.0 0.0 0.0\n")
+        f.write("DOMAIN_MAX 1.0 1.0 1.0\n")
+        for r, g, b in rgb:
+            f.write(f"{r:.6f} {g:.6f} {b:.6f}\n")
+
+
+def read_cube(path: str) -> MatLike:
+    """
+    Reads a 3D .cube file into a lut[b, g, r] table (see bake_lut3d).
+
+    Only the default 0-1 domain is supported.
+    """
+
+    size = None
+    values = []
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            key, _, rest = line.partition(" ")
+            if key == "LUT_3D_SIZE":
+                size = int(rest)
+            elif key == "LUT_1D_SIZE":
+                raise ValueError(f"{path}: 1D .cube files aren't supported")
+            elif key == "DOMAIN_MIN":
+                if any(float(v) != 0.0 for v in rest.split()):
+                    raise ValueError(f"{path}: unsupported DOMAIN_MIN {rest}")
+            elif key == "DOMAIN_MAX":
+                if any(float(v) != 1.0 for v in rest.split()):
+                    raise ValueError(f"{path}: unsupported DOMAIN_MAX {rest}")
+            elif key[0].isdigit() or key[0] in "-.":
+                values.append([float(v) for v in line.split()[:3]])
+
+    if size is None:
+        raise ValueError(f"{path}: missing LUT_3D_SIZE")
+    if len(values) != size ** 3:
+        raise ValueError(f"{path}: expected {size ** 3} entries, got {len(values)}")
+
+    rgb = np.asarray(values, dtype=np.float32).reshape(size, size, size, 3)
+    return rgb[..., ::-1] * 255.0
@@ -1,52 +1,231 @@
-import cv2
+"""
+Blurred gamma noise, from a bank of seeded low-resolution textures.
+
+The noise field is white noise blurred by a Gaussian of sigma (101 - x_noise,
+101 - y_noise) pixels. A blur that wide leaves nothing finer than about
+sigma / 4 pixels, so the field is generated on a grid that coarse (by FFT,
+which makes it periodic) and interpolated up, with its amplitude matched to
+a full-resolution field. Textures are cached in a bank keyed on (grid
+shape, sigmas), capped at BANK_BYTES; each frame picks one and a
+wrap-around offset with its rng, so a frame seeded from (seed, frame index) renders the same way in
+any run, worker or tile.
+
+Each pixel is then raised to a per-pixel gamma through a 2D table over
+(gamma, value), gamma log-spaced on GAMMA_LEVELS rows with a row at
+exactly 1 (within one level of the exact power), and the field is only
+ever interpolated for the rows being rendered, so any rect of a frame is
+computed on its own.
+"""
+import math
 import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
 from cv2.typing import MatLike
+from .arena import Arena, output, scratch
+from .plan import FilterPlan, PlanCache
 
 
-def noise(
-    img: MatLike,
+GAMMA_MIN = 0.2
+GAMMA_MAX = 3.0
+GAMMA_LEVELS = 1024
+'Rows of the power table; log-spaced gammas keep it within one level'
+GAMMA_STEP = math.log(GAMMA_MAX / GAMMA_MIN) / (GAMMA_LEVELS - 1)
+'Log-gamma between rows'
+GAMMA_ONE_ROW = round(math.log(1 / GAMMA_MIN) / GAMMA_STEP)
+'Row of gamma 1 (the identity, where most of the field is)'
+BANK_TEXTURES = 8
+'Textures per (grid shape, sigmas); frames pick one and an offset'
+BANK_BYTES = 128 * 1024 * 1024
+'Memory of the cached textures; fine grids of big frames get fewer of them'
+BANK_SEED = 0x6E6F697365
+CELL_SIGMAS = 4
+'Grid cells per sigma: the coarsest grid the blurred field survives'
+BLOCK_PIXELS = 1 << 16
+'Pixels per block of the table lookup (cache-sized temporaries)'
+
+
+@lru_cache(maxsize=1)
+def _power_lut() -> MatLike:
+    'v → round((v / 255) ** gamma * 255) for each gamma row, flattened for np.take'
+    gammas = np.exp((np.arange(GAMMA_LEVELS) - GAMMA_ONE_ROW) * GAMMA_STEP)
+    values = np.arange(256) / 255.0
+    table = np.rint(values[None, :] ** gammas[:, None] * 255.0)
+    return table.astype(np.uint8).ravel()
+
+
+class NoiseTexture(FilterPlan):
+    """
+    Texture k of the bank: periodic zero-mean noise on a grid of (rows,
+    cols) cells, blurred by sigmas given in cells.
+    """
+
+    def __init__(self, shape: tuple[int, int], sigma_y: float, sigma_x: float, k: int):
+        super().__init__(shape, sigma_y=sigma_y, sigma_x=sigma_x, k=k)
+
+        rng = np.random.default_rng(np.random.SeedSequence(BANK_SEED, spawn_key=(k,)))
+        white = rng.random(shape, dtype=np.float32)
+        white -= 0.5
+
+        # Gaussian transfer function: blurring wraps around the grid
+        fy = np.fft.fftfreq(shape[0])[:, None]
+        fx = np.fft.rfftfreq(shape[1])[None, :]
+        transfer = np.exp(-2 * np.pi ** 2 * ((sigma_y * fy) ** 2 + (sigma_x * fx) ** 2))
+
+        self.texture = np.fft.irfft2(np.fft.rfft2(white) * transfer, s=shape).astype(np.float32)
+        self.texture.setflags(write=False)
+
+
+_TEXTURES = PlanCache(max_bytes=BANK_BYTES)
+
+
+def bank_size(grid: tuple[int, int]) -> int:
+    'Textures in the bank of a grid: as many as fit in BANK_BYTES, up to BANK_TEXTURES'
+    return max(1, min(BANK_TEXTURES, BANK_BYTES // (grid[0] * grid[1] * 4)))
+
+
+def noise_texture(grid: tuple[int, int], sigma_y: float, sigma_x: float, k: int) -> MatLike:
+    'Texture k of the bank of grid (see NoiseTexture). Read-only, shared'
+    return _TEXTURES.get(NoiseTexture, grid, sigma_y=sigma_y, sigma_x=sigma_x, k=k).texture
+
+
+@dataclass(frozen=True)
+class NoiseField:
+    """
+    The noise of one frame: gamma table rows on a coarse periodic grid,
+    and where the frame sits on it. Any rect of the frame is interpolated
+    from it alone.
+    """
+
+    rows: MatLike
+    'Fractional row of the power table per grid cell'
+    cell: tuple[int, int]
+    'Cell size in frame pixels (y, x)'
+    offset: tuple[int, int]
+    'Grid cell under the frame\'s top-left corner'
+
+    def _axis(self, start: int, stop: int, axis: int) -> tuple:
+        # Absolute frame coordinates, so every rect agrees with the frame
+        cell = self.cell[axis]
+        u = (np.arange(start, stop) + 0.5) / cell - 0.5 + self.offset[axis]
+        i0 = np.floor(u).astype(np.intp)
+        t = (u - i0).astype(np.float32)
+        n = self.rows.shape[axis]
+        return i0 % n, (i0 + 1) % n, t
+
+    def table_rows(self, rect: tuple[int, int, int, int], arena: Arena | None = None) -> MatLike:
+        """
+        Table row * 256 of each pixel of the (y0, y1, x0, x1) rect, as
+        uint32 (the flat table index, less the pixel value).
+        """
+
+        y0, y1, x0, x1 = rect
+        iy0, iy1, ty = self._axis(y0, y1, 0)
+        ix0, ix1, tx = self._axis(x0, x1, 1)
+        h, w = y1 - y0, x1 - x0
+
+        # Rows first, on the coarse grid's width
+        by_row = self.rows[iy0] * (1 - ty)[:, None]
+        by_row += self.rows[iy1] * ty[:, None]
+
+        left = scratch(arena, "noise_left", (h, w), np.float32)
+        right = scratch(arena, "noise_right", (h, w), np.float32)
+        np.take(by_row, ix0, axis=1, out=left)
+        np.take(by_row, ix1, axis=1, out=right)
+        left *= 1 - tx
+        right *= tx
+        left += right
+
+        # Rounded, then shifted into the high byte
+        left += 0.5
+        rows = scratch(arena, "noise_rows", (h, w), np.uint32)
+        np.copyto(rows, left, casting="unsafe")
+        np.left_shift(rows, 8, out=rows)
+        return rows
+
+
+def noise_field(
+    shape: tuple[int, int],
     x_noise: int,
     y_noise: int,
-    intensity: int
-) -> MatLike:
+    intensity: int,
+    rng: np.random.Generator | None = None
+) -> NoiseField | None:
+    """
+    The noise of an (h, w) frame, or None when the params make it a no-op.
+    rng picks the bank texture and offset.
+    """
+
+    if (x_noise == 0 and y_noise == 0) or intensity == 0:
+        return None
 
-    # Normalize intensity
-    intensity_norm = intensity / 100.0
+    rng = rng or np.random.default_rng()
 
     # Invert noise on axis
     sigma_x = 101 - x_noise
     sigma_y = 101 - y_noise
 
-    # Normalize image
-    img_norm = img.astype(np.float32) / 255.0
+    h, w = shape[:2]
+    cell = (max(1, sigma_y // CELL_SIGMAS), max(1, sigma_x // CELL_SIGMAS))
+    grid = (-(-h // cell[0]), -(-w // cell[1]))
 
-    h, w = img.shape[:2]
+    k = int(rng.integers(bank_size(grid)))
+    offset = (int(rng.integers(grid[0])), int(rng.integers(grid[1])))
+    texture = noise_texture(grid, sigma_y / cell[0], sigma_x / cell[1], k)
 
-    # Handle 0 values
-    if x_noise == 0 and y_noise == 0:
-        return img
-    if intensity == 0:
-        return img
+    # Blurred white noise has a std inversely proportional to sqrt(sigma_y
+    # * sigma_x): on the coarse grid that's cell[0] * cell[1] times too
+    # much variance. Then [-1, 1] noise → gamma 1 + noise * intensity * 2
+    scale = 2.0 / math.sqrt(cell[0] * cell[1]) * (intensity / 100.0) * 2
+    gamma = 1.0 + texture * np.float32(scale)
+    np.clip(gamma, GAMMA_MIN, GAMMA_MAX, out=gamma)
+
+    rows = np.log(gamma)
+    rows /= GAMMA_STEP
+    rows += GAMMA_ONE_ROW
+    np.clip(rows, 0, GAMMA_LEVELS - 1, out=rows)
+    return NoiseField(rows, cell, offset)
 
-    # Noise map
-    noise = cv2.GaussianBlur(
-        np.random.rand(h, w).astype(np.float32),
-        (0, 0),
-        sigmaX=sigma_x,
-        sigmaY=sigma_y
-    )
 
-    # Normalize noise to [-1, 1]
-    noise = (noise - 0.5) * 2.0
+def noise(
+    img: MatLike,
+    x_noise: int,
+    y_noise: int,
+    intensity: int,
+    rng: np.random.Generator | None = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None,
+    field: NoiseField | None = None,
+    origin: tuple[int, int] = (0, 0)
+) -> MatLike:
+    """
+    Applies a blurred gamma noise.
+
+    rng: random generator; pass a seeded one for reproducible noise.
+    field, origin: the noise_field of the whole frame and the (y, x) of
+    img in it, when img is one tile of a frame; rng is then unused.
+    """
 
-    # Noise map
-    gamma_map = 1 + noise * intensity_norm * 2
-    gamma_map = np.clip(gamma_map, 0.2, 3.0)
+    out = output(out, img)
+
+    # Handle 0 values
+    if (x_noise == 0 and y_noise == 0) or intensity == 0:
+        np.copyto(out, img)
+        return out
+
+    if field is None:
+        field = noise_field(img.shape, x_noise, y_noise, intensity, rng)
+
+    lut = _power_lut()
+    h, w = img.shape[:2]
+    block = max(1, BLOCK_PIXELS // w)
+    y0, x0 = origin
 
-    # Apply
-    out_norm = np.power(img_norm, gamma_map[..., None])
-    out_norm = np.clip(out_norm, 0.0, 1.0)
+    for y in range(0, h, block):
+        y1 = min(h, y + block)
+        rows = field.table_rows((y0 + y, y0 + y1, x0, x0 + w), arena)
 
-    out = (out_norm * 255.0).astype(np.uint8)
+        index = scratch(arena, "noise_index", (y1 - y, w, 3), np.uint32)
+        np.add(img[y:y1], rows[..., None], out=index)
+        np.take(lut, index, out=out[y:y1], mode="clip")
 
-    return out
\ No newline at end of file
+    return out
@@ -1,6 +1,9 @@
+import numpy as np
 from cv2.typing import MatLike
+from .arena import Arena, output
 
-def original(frame: MatLike) -> MatLike:
+def original(frame: MatLike, out: MatLike | None = None, arena: Arena | None = None) -> MatLike:
     print("Filter: original")
-    frame = frame.copy()
-    return frame
\ No newline at end of file
+    out = output(out, frame)
+    np.copyto(out, frame)
+    return out
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from cv2.typing import MatLike
+from typing import Hashable, Tuple
+from .arena import Arena
+
+
+Rect = Tuple[int, int, int, int]
+'(y0, y1, x0, x1) region of a frame, end exclusive'
+
+class FilterPlan:
+    """
+    Reusable state of a filter for one frame shape and one set of params.
+
+    Subclasses build everything that doesn't depend on pixel values in
+    __init__ (the prepare step) and only do per-pixel work in execute().
+    """
+
+    def __init__(self, shape: Tuple[int, int], **params):
+        self.shape = shape
+        self.params = params
+
+    @property
+    def nbytes(self) -> int:
+        'Memory held by the plan, for the cache budget'
+        return sum(
+            getattr(value, "nbytes", 0)
+            for value in vars(self).values()
+        )
+
+    def execute(
+        self,
+        img: MatLike,
+        out: MatLike | None = None,
+        arena: Arena | None = None
+    ) -> MatLike:
+        """
+        Runs the per-pixel work. out (same shape/dtype as img, not aliasing
+        it) receives the result; arena provides reusable temporaries.
+        """
+        raise NotImplementedError
+
+
+class PlanCache:
+    """
+    LRU cache of plans keyed on (plan class, shape, params), capped by the
+    total bytes the plans hold. Thread safe.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._plans: OrderedDict[Hashable, FilterPlan] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, plan_cls: type, shape: Tuple[int, ...], **params) -> FilterPlan:
+        shape = tuple(shape[:2])
+        key = (plan_cls, shape, tuple(sorted(params.items())))
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        # Built outside the lock, so slow prepares don't block other filters
+        plan = plan_cls(shape, **params)
+        size = plan.nbytes
+
+        if size > self.max_bytes:
+            return plan
+
+        with self._lock:
+            if key not in self._plans:
+                self._plans[key] = plan
+                self._bytes += size
+            self._plans.move_to_end(key)
+
+            while self._bytes > self.max_bytes:
+                _, old = self._plans.popitem(last=False)
+                self._bytes -= old.nbytes
+
+            return self._plans[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+            self._bytes = 0
+
+
+PLAN_CACHE = PlanCache(max_bytes=512 * 1024 * 1024)
+
+
+def get_plan(plan_cls: type, shape: Tuple[int, ...], **params) -> FilterPlan:
+    return PLAN_CACHE.get(plan_cls, shape, **params)
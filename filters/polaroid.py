@@ -1,11 +1,13 @@
 from cv2.typing import MatLike
-from .saturation import saturation
-from .contrast import contrast
-from .warmth import warmth
-from .vignette import vignette
+from .composite import composite
+from .arena import Arena
 
 def polaroid(
-    img: MatLike
+    img: MatLike,
+    out: MatLike | None = None,
+    arena: Arena | None = None,
+    origin: tuple[int, int] = (0, 0),
+    frame_shape: tuple[int, int] | None = None
 ) -> MatLike:
     """
     Apply polaroid filter to given image
@@ -21,9 +23,10 @@ def polaroid(
     CONTRAST = 10
     VIGNETTE = 25
 
-    img = saturation(img=img, intensity=SATURATION)
-    img = warmth(img=img, intensity=WARMTH)
-    img = contrast(img=img, intensity=CONTRAST)
-    img = vignette(img=img, intensity=VIGNETTE)
-
-    return img
+    # One float32 pass, clipped once at the end
+    return composite(img, (
+        ("saturation", {"intensity": SATURATION}),
+        ("warmth", {"intensity": WARMTH}),
+        ("contrast", {"intensity": CONTRAST}),
+        ("vignette", {"intensity": VIGNETTE})
+    ), out=out, arena=arena, origin=origin, frame_shape=frame_shape)
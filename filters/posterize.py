@@ -1,22 +1,16 @@
+import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
 
-def posterize(
+def _posterize(
     img: MatLike,
     levels: int = 4
 ) -> MatLike:
     """
-    Applies a posterization effect.
-
-    Reduces the number of tonal levels per channel.
-
-    Parameters:
-        img (MatLike): Input image (BGR).
-        levels (int): Number of color levels per channel (min=2, max=256).
-
-    Returns:
-        MatLike: Posterized image.
+    Pointwise math, compiled into a LUT by posterize_lut().
     """
 
     # Convert to float
@@ -30,3 +24,29 @@ def posterize(
     out = np.clip(poster, 0, 255).astype(np.uint8)
 
     return out
+
+
+def posterize_lut(levels: int) -> MatLike:
+    return compile_lut(_posterize, levels=levels)
+
+
+def posterize(
+    img: MatLike,
+    levels: int = 4,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Applies a posterization effect.
+
+    Reduces the number of tonal levels per channel.
+
+    Parameters:
+        img (MatLike): Input image (BGR).
+        levels (int): Number of color levels per channel (min=2, max=256).
+
+    Returns:
+        MatLike: Posterized image.
+    """
+
+    return cv2.LUT(img, posterize_lut(levels=levels), dst=output(out, img))
@@ -0,0 +1,222 @@
+"""
+Region rendering: the filtered pixels of one rectangle of a frame, computed
+from only the part of the source they depend on.
+
+Big frames can then be processed in tiles (in parallel, or band by band
+without holding the frame in memory) and still match the whole-frame
+filter exactly. Each filter that supports it has a RegionKernel saying
+what a rect of output needs:
+
+    pointwise  → the same rect of source
+    halo       → the rect grown by the filter's radius (blur)
+    positional → the same rect, plus where it is in the frame
+                 (vignette, scanlines, polaroid)
+    remap      → the bounding box of the rect's source coordinates
+                 (warp, ca_radial, ca_linear)
+    noise      → the same rect, and the frame's coarse noise field
+
+Filters without a kernel (downscale_resolution, crt) need the whole frame.
+"""
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from typing import Any, Callable, Dict, Mapping
+from .plan import Rect
+from .arena import Arena, scratch
+from .warp import warp_maps
+from .ca_radial import ca_radial_maps, remap_channels
+from .ca_linear import ca_linear_maps
+from .noise import noise_field
+from .blur import blur_radius
+
+
+Reader = Callable[[Rect], MatLike]
+'Returns the source pixels of a rect of the frame'
+
+
+class RegionKernel:
+    """
+    How one filter renders a rect of its output.
+    """
+
+    def prepare(
+        self,
+        frame_shape: tuple[int, int],
+        params: Mapping[str, Any],
+        rng: np.random.Generator | None = None
+    ) -> Any:
+        """
+        Per-frame state shared by every rect of the frame (computed once,
+        before the rects are rendered).
+        """
+        return None
+
+    def render(
+        self,
+        fn: Callable[..., MatLike],
+        read: Reader,
+        rect: Rect,
+        frame_shape: tuple[int, int],
+        params: Mapping[str, Any],
+        state: Any,
+        out: MatLike,
+        arena: Arena | None = None
+    ) -> MatLike:
+        raise NotImplementedError
+
+
+class Pointwise(RegionKernel):
+    def render(self, fn, read, rect, frame_shape, params, state, out, arena=None):
+        return fn(read(rect), **params, out=out, arena=arena)
+
+
+class Halo(RegionKernel):
+    def __init__(self, radius: Callable[[Mapping[str, Any]], int]):
+        self.radius = radius
+        'params → how far outside a pixel the filter reads'
+
+    def render(self, fn, read, rect, frame_shape, params, state, out, arena=None):
+        h, w = frame_shape
+        r = self.radius(params)
+        y0, y1, x0, x1 = rect
+
+        # Clipped at the frame edge, where the filter's own border rule applies
+        src_rect = (max(0, y0 - r), min(h, y1 + r), max(0, x0 - r), min(w, x1 + r))
+        src = read(src_rect)
+
+        result = scratch(arena, "region_halo", src.shape, src.dtype)
+        fn(src, **params, out=result, arena=arena)
+
+        oy, ox = y0 - src_rect[0], x0 - src_rect[2]
+        np.copyto(out, result[oy:oy + y1 - y0, ox:ox + x1 - x0])
+        return out
+
+
+class Positional(RegionKernel):
+    def __init__(self, needs_frame_shape: bool = True):
+        self.needs_frame_shape = needs_frame_shape
+
+    def render(self, fn, read, rect, frame_shape, params, state, out, arena=None):
+        kwargs = {"origin": (rect[0], rect[2])}
+        if self.needs_frame_shape:
+            kwargs["frame_shape"] = tuple(frame_shape)
+
+        return fn(read(rect), **params, out=out, arena=arena, **kwargs)
+
+
+class Remap(RegionKernel):
+    def __init__(self, maps: Callable[..., tuple]):
+        self.maps = maps
+        '(frame_shape, **params, rect=) → (map_x, map_y) per channel, or one pair for all'
+
+    def render(self, fn, read, rect, frame_shape, params, state, out, arena=None):
+        h, w = frame_shape
+        maps = self.maps(frame_shape, **params, rect=rect)
+
+        # Bounding box of everything the maps read; one pixel of margin on
+        # each side covers bilinear neighbours and cv2's 1/32 rounding
+        lo_x = min(float(mx.min()) for mx, _ in maps)
+        hi_x = max(float(mx.max()) for mx, _ in maps)
+        lo_y = min(float(my.min()) for _, my in maps)
+        hi_y = max(float(my.max()) for _, my in maps)
+
+        src_rect = (
+            max(0, int(np.floor(lo_y)) - 1), min(h, int(np.floor(hi_y)) + 3),
+            max(0, int(np.floor(lo_x)) - 1), min(w, int(np.floor(hi_x)) + 3)
+        )
+
+        # Everything reads outside the frame: black, like the border
+        if src_rect[0] >= src_rect[1] or src_rect[2] >= src_rect[3]:
+            out[...] = 0
+            return out
+
+        src = read(src_rect)
+
+        # Integer shifts keep the maps' fractions (and so the result) exact
+        sy, sx = np.float32(src_rect[0]), np.float32(src_rect[2])
+        maps = tuple((mx - sx, my - sy) for mx, my in maps)
+
+        if len(maps) == 1:
+            return cv2.remap(
+                src,
+                *maps[0],
+                dst=out,
+                interpolation=cv2.INTER_LINEAR,
+                borderMode=cv2.BORDER_CONSTANT,
+                borderValue=0
+            )
+        return remap_channels(src, maps, out, arena)
+
+
+class Noise(RegionKernel):
+    def prepare(self, frame_shape, params, rng=None):
+        return noise_field(frame_shape, **params, rng=rng)
+
+    def render(self, fn, read, rect, frame_shape, params, state, out, arena=None):
+        return fn(read(rect), **params, out=out, arena=arena, field=state, origin=rect[::2])
+
+
+POINTWISE = Pointwise()
+
+REGION_KERNELS: Dict[str, RegionKernel] = {
+    "original": POINTWISE,
+    "saturation": POINTWISE,
+    "warmth": POINTWISE,
+    "contrast": POINTWISE,
+    "gamma": POINTWISE,
+    "posterize": POINTWISE,
+    "bit_depth": POINTWISE,
+    "banding": POINTWISE,
+    "banding_luminance": POINTWISE,
+    "blur": Halo(lambda p: blur_radius(**p)),
+    "scanlines": Positional(needs_frame_shape=False),
+    "vignette": Positional(),
+    "polaroid": Positional(),
+    "warp": Remap(lambda shape, curvature, rect: (warp_maps(shape, curvature, rect),)),
+    "ca_radial": Remap(ca_radial_maps),
+    "ca_linear": Remap(ca_linear_maps),
+    "noise": Noise()
+}
+'Filter name → its region kernel'
+
+
+def array_reader(img: MatLike) -> Reader:
+    'Reader over an in-memory frame (views, no copies)'
+    return lambda rect: img[rect[0]:rect[1], rect[2]:rect[3]]
+
+
+def render_region(
+    name: str,
+    fn: Callable[..., MatLike],
+    params: Mapping[str, Any],
+    read: Reader,
+    frame_shape: tuple[int, int],
+    rect: Rect,
+    state: Any = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Renders the rect of the filtered frame.
+
+    Parameters:
+        name, fn, params : the filter
+        read             : source pixels of a rect of the frame
+        frame_shape      : (h, w) of the whole frame
+        state            : REGION_KERNELS[name].prepare() for this frame
+        out              : (rect h, rect w, 3) destination
+    """
+
+    y0, y1, x0, x1 = rect
+    if out is None:
+        out = np.empty((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+
+    result = REGION_KERNELS[name].render(
+        fn, read, rect, tuple(frame_shape[:2]), params, state, out, arena
+    )
+
+    # cv2 writes a new array when out is a non-contiguous view
+    if result is not out:
+        np.copyto(out, result)
+    return out
@@ -1,9 +1,38 @@
-import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .arena import Arena, output, scratch
 
 
-def saturation(img: MatLike, intensity: int) -> MatLike:
+def saturation_f(img_f: MatLike, intensity: int, arena: Arena | None = None) -> MatLike:
+    """
+    In-place saturation on a float32 BGR image (0-255 scale, unclipped).
+    Used by composite() to chain filters without uint8 round trips.
+    """
+
+    sat_factor = 1.0 + intensity / 100.0
+
+    # Perceptual Luminance (BGR)
+    gray = scratch(arena, "saturation_gray", img_f.shape[:2], np.float32)
+    tmp = scratch(arena, "saturation_tmp", img_f.shape[:2], np.float32)
+    np.multiply(img_f[:, :, 0], 0.114, out=gray)
+    gray += np.multiply(img_f[:, :, 1], 0.587, out=tmp)
+    gray += np.multiply(img_f[:, :, 2], 0.299, out=tmp)
+    gray = gray[:, :, np.newaxis]
+
+    # gray + (img - gray) * factor
+    img_f -= gray
+    img_f *= sat_factor
+    img_f += gray
+
+    return img_f
+
+
+def saturation(
+    img: MatLike,
+    intensity: int,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
     """
     Adjusts the color saturation.
 
@@ -13,27 +42,15 @@ def saturation(img: MatLike, intensity: int) -> MatLike:
         +100 → strong colors
     """
 
-    # Normalize to [-1.0, +1.0]
-    norm = intensity / 100.0
-
-    # Saturation Factor
-    sat_factor = 1.0 + norm
-
     # Convert to float to avoid overflow
-    img_f = img.astype(np.float32)
-
-    # Perceptual Luminance (BGR)
-    gray = (
-        0.114 * img_f[:, :, 0] +
-        0.587 * img_f[:, :, 1] +
-        0.299 * img_f[:, :, 2]
-    )
-
-    # Expand to broadcast
-    gray = gray[:, :, np.newaxis]
+    img_f = scratch(arena, "saturation_img_f", img.shape, np.float32)
+    np.copyto(img_f, img)
 
     # Apply
-    result = gray + (img_f - gray) * sat_factor
+    saturation_f(img_f, intensity, arena)
 
     # Clamp and convert back
-    return np.clip(result, 0, 255).astype(np.uint8)
+    np.clip(img_f, 0, 255, out=img_f)
+    out = output(out, img)
+    np.copyto(out, img_f, casting="unsafe")
+    return out
@@ -1,10 +1,54 @@
+import cv2
+import numpy as np
+from functools import lru_cache
 from cv2.typing import MatLike
+from .arena import Arena, output
+
+
+@lru_cache(maxsize=128)
+def _dim_lut(intensity: float) -> MatLike:
+    'v → int(v * (1 - intensity)), as a cv2.LUT table'
+    return (np.arange(256) * (1 - intensity)).astype("uint8")
+
 
 def scanlines(frame: MatLike,
               intensity: int = 50,
-              spacing: int = 2) -> MatLike:
+              spacing: int = 2,
+              out: MatLike | None = None,
+              arena: Arena | None = None,
+              origin: tuple[int, int] = (0, 0)) -> MatLike:
     intensity = intensity / 100
 
-    frame = frame.copy()
-    frame[::spacing, :, :] = (frame[::spacing, :, :] * (1 - intensity)).astype("uint8")
-    return frame
\ No newline at end of file
+    out = output(out, frame)
+    if out is not frame:
+        np.copyto(out, frame)
+
+    # Dim every `spacing`-th row of the frame in place; origin is the (y, x)
+    # position of a patch in its frame, so patches keep the frame's phase
+    rows = out[-origin[0] % spacing::spacing, :, :]
+    cv2.LUT(rows, _dim_lut(intensity), dst=rows)
+    return out
+
+
+def scanlines_batch(frames: MatLike,
+                    intensity: int = 50,
+                    spacing: int = 2,
+                    out: MatLike | None = None,
+                    arena: Arena | None = None) -> MatLike:
+    """
+    scanlines over an NxHxWx3 stack of frames.
+    """
+
+    n, h = frames.shape[:2]
+
+    # Stacked rows keep their parity when h is a multiple of spacing,
+    # so the whole stack is one tall frame
+    if h % spacing == 0:
+        flat_out = None if out is None else out.reshape(n * h, *frames.shape[2:])
+        result = scanlines(frames.reshape(n * h, *frames.shape[2:]), intensity, spacing, flat_out)
+        return result.reshape(frames.shape)
+
+    out = output(out, frames)
+    for i in range(n):
+        scanlines(frames[i], intensity, spacing, out[i])
+    return out
@@ -0,0 +1,146 @@
+"""
+Frame history of temporal filters.
+
+Temporal filters (Filters.t_filters) see the frames before the current one
+through a FrameHistory: preallocated rings of the last input and output
+frames of the stream. Each frame is written into the rings once and past
+frames are read back as views, so looking N frames back copies nothing.
+
+Each filter declares in TEMPORAL_KERNELS how far back it looks, which
+sizes the rings, and how many frames of pre-roll rebuild its state when a
+render starts mid-stream (chunked exports): exactly for a window of past
+inputs, and to within a level or two for feedback on past outputs, which
+decays geometrically.
+"""
+import math
+import numpy as np
+from dataclasses import dataclass
+from cv2.typing import MatLike
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+
+@dataclass(frozen=True)
+class TemporalKernel:
+    """
+    History needs of a temporal filter, as functions of its params.
+    """
+
+    inputs: Callable[[Mapping[str, int]], int] = lambda params: 0
+    'Past input frames read'
+    outputs: Callable[[Mapping[str, int]], int] = lambda params: 0
+    'Past output frames read'
+    preroll: Callable[[Mapping[str, int]], int] = lambda params: 0
+    'Frames to render before the first one written for the same result'
+
+    def depth(self, params: Mapping[str, int]) -> Tuple[int, int]:
+        return self.inputs(params), self.outputs(params)
+
+
+def feedback_preroll(percent: int) -> int:
+    'Frames until feedback of percent% per frame falls under half a level'
+    if percent <= 0:
+        return 0
+    return math.ceil(math.log(0.5 / 255) / math.log(percent / 100))
+
+
+class FrameHistory:
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        inputs: int = 0,
+        outputs: int = 0,
+        fps: float = 30.0,
+        name: str | None = None
+    ):
+        """
+        Parameters:
+            shape   : (h, w, 3) of the frames
+            inputs  : past input frames kept
+            outputs : past output frames kept
+            fps     : frame rate, for timestamps
+            name    : filter the history belongs to
+        """
+
+        self.shape = tuple(shape)
+        self.name = name
+        self.depth = (inputs, outputs)
+        self.fps = fps
+
+        # One more slot each for the current frame
+        self._inputs = np.empty((inputs + 1, *self.shape), dtype=np.uint8)
+        self._outputs = np.empty((outputs + 1, *self.shape), dtype=np.uint8)
+
+        self.index = -1
+        'Frame index of the current frame (-1 before the first one)'
+        self.timestamp = 0.0
+        'Seconds from the start of the stream to the current frame'
+        self.state: Dict[str, Any] = {}
+        'Running state of the filter (e.g. sums); dropped with the history'
+        self._head = -1
+        self._count = 0
+
+    def reset(self) -> None:
+        'Forgets every frame (a seek, or the start of a new stream)'
+        self.index = -1
+        self.state.clear()
+        self._head = -1
+        self._count = 0
+
+    def push(self, frame: MatLike, index: int) -> MatLike:
+        """
+        Starts frame index: stores its input and returns the output slot
+        the filter renders into.
+
+        Pushing the current index again re-renders that frame in place
+        (e.g. with new params), keeping the frames before it; running
+        state is dropped, since it already counted the old render.
+        """
+
+        if index == self.index:
+            self.state.clear()
+        else:
+            self._head += 1
+            self._count += 1
+
+        self.index = index
+        self.timestamp = index / self.fps
+
+        np.copyto(self._inputs[self._head % len(self._inputs)], frame)
+        return self._outputs[self._head % len(self._outputs)]
+
+    @property
+    def frames(self) -> int:
+        'Frames pushed since the last reset, the current one included'
+        return self._count
+
+    def input(self, age: int = 0) -> MatLike | None:
+        'Input frame age frames back (0: current), or None if not kept'
+        if age >= min(self._count, len(self._inputs)):
+            return None
+        return self._inputs[(self._head - age) % len(self._inputs)]
+
+    def output(self, age: int = 1) -> MatLike | None:
+        'Output frame age frames back (0: being rendered), or None if not kept'
+        if age >= min(self._count, len(self._outputs)):
+            return None
+        return self._outputs[(self._head - age) % len(self._outputs)]
+
+
+TEMPORAL_KERNELS: Dict[str, TemporalKernel] = {
+    # Only reads the timestamp
+    "vhs_tracking": TemporalKernel(),
+    "vhs_bleed": TemporalKernel(
+        outputs=lambda params: 1,
+        preroll=lambda params: feedback_preroll(params["lag"])
+    ),
+    "vhs_ghosting": TemporalKernel(
+        outputs=lambda params: 1,
+        preroll=lambda params: feedback_preroll(params["trails"])
+    ),
+    # The frame leaving the window is subtracted from the running sum
+    "vhs_blend": TemporalKernel(
+        inputs=lambda params: params["frames"],
+        preroll=lambda params: max(0, params["frames"] - 1)
+    )
+}
+'Temporal filter → its history needs'
@@ -0,0 +1,181 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from .arena import Arena, output, scratch
+from .temporal import FrameHistory
+
+
+BAND_TEAR = 8
+'Tracking band lines shift up to this many times the jitter'
+
+
+def vhs_tracking(
+    img: MatLike,
+    jitter: int = 2,
+    band: int = 10,
+    speed: int = 25,
+    history: FrameHistory | None = None,
+    rng: np.random.Generator | None = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Tracking errors: every line shifts sideways by up to jitter pixels,
+    and a band of band% of the height, rolling down the frame at speed% of
+    the height per second, tears sideways much further.
+
+    rng: random generator; pass a seeded one for reproducible jitter.
+    """
+
+    out = output(out, img)
+    if jitter == 0:
+        np.copyto(out, img)
+        return out
+
+    rng = rng or np.random.default_rng()
+    timestamp = history.timestamp if history is not None else 0.0
+    h, w = img.shape[:2]
+
+    # Per-line shift in [-jitter, jitter]
+    offsets = rng.random(h, dtype=np.float32)
+    offsets -= 0.5
+    offsets *= 2 * jitter
+
+    rows = np.arange(h, dtype=np.float32)
+
+    if band:
+        # Top row of the band; it leaves the bottom before coming back on top
+        band_h = max(1, h * band // 100)
+        top = (timestamp * speed / 100 * h) % (h + band_h) - band_h
+        phase = (rows - top) / band_h
+        inside = (phase >= 0) & (phase < 1)
+        offsets[inside] += np.sin(np.pi * phase[inside]) * jitter * BAND_TEAR
+
+    map_x = scratch(arena, "vhs_map_x", (h, w), np.float32)
+    np.add(np.arange(w, dtype=np.float32), offsets[:, None], out=map_x)
+    map_y = scratch(arena, "vhs_map_y", (h, w), np.float32)
+    np.copyto(map_y, rows[:, None])
+
+    return cv2.remap(
+        img,
+        map_x,
+        map_y,
+        cv2.INTER_LINEAR,
+        dst=out,
+        borderMode=cv2.BORDER_CONSTANT
+    )
+
+
+def vhs_bleed(
+    img: MatLike,
+    bleed: int = 4,
+    lag: int = 30,
+    history: FrameHistory | None = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Chroma bleed: colour smears up to 2 * bleed pixels right of where it
+    belongs, as with tape's narrow chroma bandwidth, and lags behind: lag%
+    of the previous output frame's colour stays. Luma is left sharp.
+    """
+
+    out = output(out, img)
+    previous = history.output(1) if history is not None and lag else None
+
+    if bleed == 0 and previous is None:
+        np.copyto(out, img)
+        return out
+
+    ycc = scratch(arena, "vhs_ycc", img.shape)
+    cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb, dst=ycc)
+
+    # Anchored on the right end: each pixel averages the ones left of it
+    smeared = scratch(arena, "vhs_smeared", img.shape)
+    if bleed:
+        cv2.blur(ycc, (2 * bleed + 1, 1), dst=smeared, anchor=(2 * bleed, 0), borderType=cv2.BORDER_REPLICATE)
+    else:
+        np.copyto(smeared, ycc)
+
+    if previous is not None:
+        previous_ycc = scratch(arena, "vhs_previous_ycc", img.shape)
+        cv2.cvtColor(previous, cv2.COLOR_BGR2YCrCb, dst=previous_ycc)
+        cv2.addWeighted(smeared, 1 - lag / 100, previous_ycc, lag / 100, 0, dst=smeared)
+
+    smeared[..., 0] = ycc[..., 0]
+    return cv2.cvtColor(smeared, cv2.COLOR_YCrCb2BGR, dst=out)
+
+
+def vhs_ghosting(
+    img: MatLike,
+    ghost: int = 6,
+    ghost_strength: int = 25,
+    trails: int = 40,
+    history: FrameHistory | None = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Ghosting and trails: a faint copy of the frame ghost pixels to the
+    right (ghost_strength%), and trails% of the previous output frame
+    kept, so moving edges leave a decaying smear.
+    """
+
+    out = output(out, img)
+    w = img.shape[1]
+    strength = ghost_strength / 100
+
+    if 0 < ghost < w and strength:
+        shifted = scratch(arena, "vhs_shifted", img.shape)
+        shifted[:, ghost:] = img[:, :-ghost]
+        shifted[:, :ghost] = img[:, :1]
+        cv2.addWeighted(img, 1 - strength, shifted, strength, 0, dst=out)
+    else:
+        np.copyto(out, img)
+
+    # Feedback: one past frame holds the whole decaying tail
+    previous = history.output(1) if history is not None and trails else None
+    if previous is not None:
+        cv2.addWeighted(out, 1 - trails / 100, previous, trails / 100, 0, dst=out)
+
+    return out
+
+
+def vhs_blend(
+    img: MatLike,
+    frames: int = 3,
+    history: FrameHistory | None = None,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Frame blending: the mean of the last `frames` input frames.
+
+    The sum is kept in the history and updated with the frame coming in
+    and the one leaving, so the cost doesn't grow with frames.
+    """
+
+    out = output(out, img)
+    if history is None or frames <= 1 or history.frames <= 1:
+        np.copyto(out, img)
+        return out
+
+    n = min(frames, history.frames)
+    total = history.state.get("vhs_blend")
+
+    if total is None:
+        total = history.state["vhs_blend"] = np.zeros(img.shape, dtype=np.int32)
+        for age in range(n):
+            np.add(total, history.input(age), out=total)
+    else:
+        np.add(total, history.input(0), out=total)
+        leaving = history.input(frames)
+        if leaving is not None:
+            np.subtract(total, leaving, out=total)
+
+    # Rounded mean
+    mean = scratch(arena, "vhs_mean", img.shape, np.int32)
+    np.add(total, n // 2, out=mean)
+    np.floor_divide(mean, n, out=mean)
+    np.copyto(out, mean, casting="unsafe")
+    return out
@@ -1,8 +1,102 @@
 import numpy as np
 from cv2.typing import MatLike
+from .plan import FilterPlan, Rect, get_plan
+from .arena import Arena, output, scratch
+
+
+class VignettePlan(FilterPlan):
+    def __init__(self, shape: tuple[int, int], intensity: int, rect: Rect | None = None):
+        super().__init__(shape, intensity=intensity, rect=rect)
+
+        # Normalize to [-1.0, +1.0]
+        norm = intensity / 100.0
+
+        h, w = shape
+        y0, y1, x0, x1 = rect or (0, h, 0, w)
+
+        # Image center
+        cx = w / 2.0
+        cy = h / 2.0
+
+        # Coordinate grids (of the rect, in frame coordinates)
+        x = np.arange(x0, x1)
+        y = np.arange(y0, y1)
+        X, Y = np.meshgrid(x, y)
+
+        # Radial distance
+        dist = np.sqrt((X - cx) ** 2 + (Y - cy) ** 2)
+
+        # Max distance
+        max_dist = np.sqrt(cx ** 2 + cy ** 2)
+
+        # Normalize distance to [0, 1]
+        d = dist / max_dist
+
+        # Smooth falloff curve
+        v = d ** 2
+
+        # Vignette strength
+        k = 0.6 * norm
+
+        # Vignette factor (float32 keeps the per-frame product in float32)
+        factor = 1.0 - k * v
+        self.factor = factor.astype(np.float32)[:, :, np.newaxis]
+
+    def execute(
+        self,
+        img: MatLike,
+        out: MatLike | None = None,
+        arena: Arena | None = None
+    ) -> MatLike:
+        # Apply
+        result = scratch(arena, "vignette_result", img.shape, np.float32)
+        np.multiply(img, self.factor, out=result)
+
+        # Clamp and convert back
+        np.clip(result, 0, 255, out=result)
+        out = output(out, img)
+        np.copyto(out, result, casting="unsafe")
+        return out
+
+
+def _plan(
+    shape: tuple[int, ...],
+    intensity: int,
+    origin: tuple[int, int],
+    frame_shape: tuple[int, int] | None
+) -> VignettePlan:
+    'Plan of the whole frame, or of the patch at origin of a frame_shape frame'
+    if frame_shape is None:
+        return get_plan(VignettePlan, shape, intensity=intensity)
+
+    y0, x0 = origin
+    rect = (y0, y0 + shape[0], x0, x0 + shape[1])
+    return get_plan(VignettePlan, frame_shape, intensity=intensity, rect=rect)
+
+
+def vignette_f(
+    img_f: MatLike,
+    intensity: int,
+    arena: Arena | None = None,
+    origin: tuple[int, int] = (0, 0),
+    frame_shape: tuple[int, int] | None = None
+) -> MatLike:
+    """
+    In-place vignette on a float32 BGR image (0-255 scale, unclipped).
+    """
 
+    img_f *= _plan(img_f.shape, intensity, origin, frame_shape).factor
+    return img_f
 
-def vignette(img: MatLike, intensity: int) -> MatLike:
+
+def vignette(
+    img: MatLike,
+    intensity: int,
+    out: MatLike | None = None,
+    arena: Arena | None = None,
+    origin: tuple[int, int] = (0, 0),
+    frame_shape: tuple[int, int] | None = None
+) -> MatLike:
     """
     Applies a vignette effect to the image.
 
@@ -10,45 +104,10 @@ def vignette(img: MatLike, intensity: int) -> MatLike:
         -100 → strong bright vignette
            0 → original
         +100 → strong dark vignette
-    """
-
-    # Normalize to [-1.0, +1.0]
-    norm = intensity / 100.0
-
-    # Convert to float
-    img_f = img.astype(np.float32)
-
-    h, w = img_f.shape[:2]
-
-    # Image center
-    cx = w / 2.0
-    cy = h / 2.0
 
-    # Coordinate grids
-    x = np.arange(w)
-    y = np.arange(h)
-    X, Y = np.meshgrid(x, y)
-
-    # Radial distance
-    dist = np.sqrt((X - cx) ** 2 + (Y - cy) ** 2)
-
-    # Max distance
-    max_dist = np.sqrt(cx ** 2 + cy ** 2)
-
-    # Normalize distance to [0, 1]
-    d = dist / max_dist
-
-    # Smooth falloff curve
-    v = d ** 2
-
-    # Vignette strength
-    k = 0.6 * norm
-
-    # Vignette factor
-    factor = 1.0 - k * v
-
-    # Apply
-    result = img_f * factor[:, :, np.newaxis]
+    origin, frame_shape: when img is only a patch of a larger frame, its
+    (y, x) position and the (h, w) of the whole frame, so the vignette is
+    centred on the frame rather than on the patch.
+    """
 
-    # Clamp and convert back
-    return np.clip(result, 0, 255).astype(np.uint8)
\ No newline at end of file
+    return _plan(img.shape, intensity, origin, frame_shape).execute(img, out, arena)
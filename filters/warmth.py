@@ -1,16 +1,13 @@
 import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .lut import compile_lut
+from .arena import Arena, output
 
 
-def warmth(img: MatLike, intensity: int) -> MatLike:
+def _warmth(img: MatLike, intensity: int) -> MatLike:
     """
-    Adjusts the color temperature (warmth) of an image.
-
-    intensity (int):
-        -100 → very cold
-           0 → original
-        +100 → very warm
+    Pointwise math, compiled into a LUT by warmth_lut().
     """
 
     # Safety clamp
@@ -31,4 +28,40 @@ def warmth(img: MatLike, intensity: int) -> MatLike:
     # Green channel intentionally unchanged
 
     # Clamp and convert back
-    return np.clip(img_f, 0, 255).astype(np.uint8)
\ No newline at end of file
+    return np.clip(img_f, 0, 255).astype(np.uint8)
+
+
+def warmth_f(img_f: MatLike, intensity: int, arena: Arena | None = None) -> MatLike:
+    """
+    In-place warmth on a float32 BGR image (0-255 scale, unclipped).
+    """
+
+    intensity = max(-100, min(100, intensity))
+    shift = 40.0 * (intensity / 100.0)
+
+    img_f[:, :, 2] += shift   # Red channel
+    img_f[:, :, 0] -= shift   # Blue channel
+
+    return img_f
+
+
+def warmth_lut(intensity: int) -> MatLike:
+    return compile_lut(_warmth, intensity=intensity)
+
+
+def warmth(
+    img: MatLike,
+    intensity: int,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Adjusts the color temperature (warmth) of an image.
+
+    intensity (int):
+        -100 → very cold
+           0 → original
+        +100 → very warm
+    """
+
+    return cv2.LUT(img, warmth_lut(intensity=intensity), dst=output(out, img))
@@ -1,31 +1,29 @@
 import cv2
 import numpy as np
 from cv2.typing import MatLike
+from .plan import FilterPlan, Rect, get_plan
+from .arena import Arena, output
 
 
-def warp(
-    img: MatLike,
-    curvature: int = 20
-) -> MatLike:
+def warp_maps(
+    shape: tuple[int, int],
+    curvature: int,
+    rect: Rect | None = None
+) -> tuple[MatLike, MatLike]:
     """
-    Applies CRT-style screen curvature warp.
-
-    Parameters:
-        img (MatLike): Input image (BGR).
-        curvature (int): Warp intensity (recommended 10-40).
-
-    Returns:
-        MatLike: Warped image.
+    Source coordinates (map_x, map_y) of the warp, for the output pixels in
+    rect (default: whole frame) of a frame of the given shape.
     """
 
-    h, w = img.shape[:2]
+    h, w = shape
+    y0, y1, x0, x1 = rect or (0, h, 0, w)
 
     # Normalize curvature
     k = curvature / 1000.0
 
     # Normalized coordinate grid [-1, 1]
-    x = np.linspace(-1.0, 1.0, w, dtype=np.float32)
-    y = np.linspace(-1.0, 1.0, h, dtype=np.float32)
+    x = np.linspace(-1.0, 1.0, w, dtype=np.float32)[x0:x1]
+    y = np.linspace(-1.0, 1.0, h, dtype=np.float32)[y0:y1]
     x, y = np.meshgrid(x, y)
 
     # CRT warp formula
@@ -36,11 +34,52 @@ def warp(
     map_x:np.float64 = ((x_warp + 1.0) * 0.5) * w
     map_y:np.float64 = ((y_warp + 1.0) * 0.5) * h
 
-    return cv2.remap(
-        img,
-        map_x.astype(np.float32),
-        map_y.astype(np.float32),
-        interpolation=cv2.INTER_LINEAR,
-        borderMode=cv2.BORDER_CONSTANT,
-        borderValue=0
-    )
+    return map_x.astype(np.float32), map_y.astype(np.float32)
+
+
+class WarpPlan(FilterPlan):
+    def __init__(self, shape: tuple[int, int], curvature: int):
+        super().__init__(shape, curvature=curvature)
+
+        self.map_x, self.map_y = warp_maps(shape, curvature)
+
+    @property
+    def channel_maps(self) -> tuple:
+        'Same (map_x, map_y) for every BGR channel'
+        return ((self.map_x, self.map_y),) * 3
+
+    def execute(
+        self,
+        img: MatLike,
+        out: MatLike | None = None,
+        arena: Arena | None = None
+    ) -> MatLike:
+        return cv2.remap(
+            img,
+            self.map_x,
+            self.map_y,
+            dst=output(out, img),
+            interpolation=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=0
+        )
+
+
+def warp(
+    img: MatLike,
+    curvature: int = 20,
+    out: MatLike | None = None,
+    arena: Arena | None = None
+) -> MatLike:
+    """
+    Applies CRT-style screen curvature warp.
+
+    Parameters:
+        img (MatLike): Input image (BGR).
+        curvature (int): Warp intensity (recommended 10-40).
+
+    Returns:
+        MatLike: Warped image.
+    """
+
+    return get_plan(WarpPlan, img.shape, curvature=curvature).execute(img, out, arena)
@@ -0,0 +1,201 @@
+"""
+Shared-memory frame transport for process-pool filtering.
+
+A FrameRing is one shared-memory block split into preallocated HxWx3 uint8
+slots. The decoder writes frames straight into a slot, worker processes
+filter the slot in place through a numpy view and the encoder reads it
+back, so only slot indices cross process boundaries (params are sent once,
+when each worker starts).
+"""
+import os
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from cv2.typing import MatLike
+from typing import Any, Dict, Tuple
+from filters.arena import Arena
+
+
+RingSpec = Tuple[str, int, Tuple[int, ...]]
+'(shared memory name, slots, frame shape)'
+
+
+class FrameRing:
+    def __init__(
+        self,
+        slots: int,
+        shape: Tuple[int, ...],
+        name: str | None = None
+    ):
+        """
+        Creates a new ring, or attaches to an existing one when name is given.
+        """
+
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.owner = name is None
+
+        nbytes = slots * int(np.prod(self.shape))
+
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self._shm = _attach(name)
+
+        self.frames = np.ndarray(
+            (slots, *self.shape),
+            dtype=np.uint8,
+            buffer=self._shm.buf
+        )
+
+    @property
+    def spec(self) -> RingSpec:
+        'Picklable description used to attach from another process'
+        return self._shm.name, self.slots, self.shape
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> "FrameRing":
+        name, slots, shape = spec
+        return cls(slots, shape, name=name)
+
+    def slot(self, i: int) -> MatLike:
+        return self.frames[i]
+
+    def close(self) -> None:
+        # Views must go before the buffer can be released
+        del self.frames
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "FrameRing":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to a ring created by the parent process.
+
+    Workers share the parent's resource tracker, which already tracks the
+    block, so attaching doesn't need (or want) tracking of its own.
+    """
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track` argument
+        return shared_memory.SharedMemory(name=name)
+
+
+# region ----|1|---- Worker side
+_worker_ring: FrameRing | None = None
+_worker_filters: Any = None
+
+
+_worker_arena: Arena | None = None
+_worker_out: MatLike | None = None
+
+
+def _init_worker(spec: RingSpec, filter_name: str, params: Dict[str, int], seed: int) -> None:
+    global _worker_ring, _worker_filters, _worker_arena, _worker_out
+    from core import build_filters
+
+    _worker_ring = FrameRing.attach(spec)
+    _worker_filters = build_filters(filter_name, params, seed=seed)
+    _worker_arena = Arena()
+    # Filters can't write over their own input, so results go through
+    # one reused buffer before being copied back into the slot
+    _worker_out = np.empty(_worker_ring.shape, dtype=np.uint8)
+
+
+def _filter_slot(slot: int, frame_index: int) -> int:
+    frame = _worker_ring.slot(slot)
+    result = _worker_filters.apply_filter(
+        frame,
+        frame_index,
+        out=_worker_out,
+        arena=_worker_arena
+    )
+    np.copyto(frame, result)
+    return slot
+# endregion -|1|-
+
+
+def export_shared(
+    cap: Any,
+    writer: Any,
+    filter_name: str,
+    params: Dict[str, int],
+    frame_shape: Tuple[int, ...],
+    seed: int = 0,
+    workers: int | None = None,
+    slots: int | None = None
+) -> int:
+    """
+    Filters frames on a process pool, passing them through a FrameRing.
+
+    The calling thread decodes into free slots and encodes finished slots
+    in decode order; a slot is reused only after it was written out.
+
+    Parameters:
+        frame_shape : (h, w, 3) of decoded frames
+        workers     : worker processes (default: cpu count)
+        slots       : ring size (default: 2 * workers)
+
+    Returns:
+        Number of frames written.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    slots = slots or 2 * workers
+
+    count = 0
+    with FrameRing(slots, frame_shape) as ring, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(ring.spec, filter_name, params, seed)
+    ) as pool:
+        free = deque(range(slots))
+        in_flight: deque[Tuple[Future, int]] = deque()
+        index = 0
+        eof = False
+
+        try:
+            while True:
+                # Fill every free slot
+                while free and not eof:
+                    slot = free.popleft()
+                    buf = ring.slot(slot)
+                    ret, frame = cap.read(buf)
+                    if not ret:
+                        free.append(slot)
+                        eof = True
+                        break
+                    if frame is not buf:
+                        buf[...] = frame
+
+                    in_flight.append((pool.submit(_filter_slot, slot, index), slot))
+                    index += 1
+
+                if not in_flight:
+                    break
+
+                # Write the oldest frame, then recycle its slot
+                future, slot = in_flight.popleft()
+                future.result()
+                writer.write(ring.slot(slot))
+                free.append(slot)
+                count += 1
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+            # Workers must be done with the ring before it's unlinked,
+            # and no view may outlive it
+            pool.shutdown(wait=True)
+            buf = frame = None
+
+    return count
@@ -1,133 +1,152 @@
 import os
 import cv2
+import numpy as np
 import tkinter as tk
 import uuid
 import inspect
-import subprocess
 from cv2.typing import MatLike
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
-from filters import *
-from typing import List, Callable, Any, Dict
-from params_defs import PARAMS_DEFS
+from typing import Callable, Dict, Hashable
+from core import Filters, VIDEO_EXTENSIONS, IMAGE_EXTENSIONS, STILL_INDEX, render_video, filter_still
+from cache import RENDER_CACHE, imread_cached, render_key
+from export import FFmpegPipeReader
+from playback import AdaptiveScale, Player
+from preview import PreviewWorker
+from proxy_store import ProxyStore, proxy_store
+from filters.arena import Arena
 
 
 PADX = 10
 PADY = 5
-VIDEO_EXTENSIONS = (".mp4", ".avi")
-IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+ZOOM_STEP = 1.25
+FRAME_BUDGET = 0.8
+'Share of the frame period the playback worker aims to use per frame'
+MAX_PIXEL_SCALE = 8
+'Deepest zoom: one source pixel on this many screen pixels'
+REDUCED_DECODE = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2
+}
+'Decode size divisor → imread flag'
 FRAME: MatLike|None = None
-FilterFn = Callable[..., MatLike]
+'Full-size source image (read-only, shared with the source cache), or the last video frame shown'
+
+
+def read_proxy(path: str, display_size: tuple[int, int]) -> tuple[Hashable, MatLike | None, float]:
+    """
+    Decodes a still at the strongest reduction (1/2, 1/4, 1/8, done by the
+    decoder) that still covers display_size.
+
+    Returns:
+        (source key, proxy, its scale relative to the source), or
+        (None, None, 1.0) when only the full size covers the display
+    """
+
+    w, h = Image.open(path).size
+    fit = min(display_size[0] / w, display_size[1] / h)
+
+    for reduction, flag in REDUCED_DECODE.items():
+        if reduction * fit <= 1:
+            key, proxy = imread_cached(path, flag)
+            if proxy is not None:
+                return key, proxy, 1 / reduction
+
+    return None, None, 1.0
+
+
+def fit_preview(roi: MatLike, size: tuple[int, int]) -> MatLike:
+    'Fits a rendered region to size (w, h) on screen (still BGR)'
+    if (roi.shape[1], roi.shape[0]) == size:
+        return roi
+
+    # Shrinking averages, magnifying shows source pixels as blocks
+    interpolation = cv2.INTER_AREA if size[0] < roi.shape[1] else cv2.INTER_NEAREST
+    return cv2.resize(roi, size, interpolation=interpolation)
+
+
+def render_preview(
+    source: MatLike,
+    rect: tuple[int, int, int, int],
+    size: tuple[int, int],
+    filters: Filters,
+    scale: float,
+    key: Hashable,
+    arena: Arena
+) -> MatLike:
+    """
+    Filters the rect of source into RENDER_CACHE and fits it to size.
+    Runs on the preview worker thread.
+    """
+
+    roi = filters.apply_region(source, rect, STILL_INDEX, arena=arena, scale=scale)
+    return fit_preview(RENDER_CACHE.put(key, roi), size)
+
+
+class PreviewDisplay:
+    """
+    Shows BGR frames in a label through one long-lived PhotoImage.
+
+    Frames are resized while still BGR into a preallocated buffer, then
+    converted into an RGBA buffer that a PIL image maps without copying
+    (PIL only maps 4-channel buffers), and pasted into the PhotoImage. No
+    arrays or Tk images are created per frame; the buffers and the
+    PhotoImage are rebuilt only when the size changes.
+    """
+
+    def __init__(self, label: tk.Label):
+        self.label = label
+        self.size: tuple[int, int] | None = None
+        self._bgr: MatLike | None = None
+        self._rgba: MatLike | None = None
+        self._pil: Image.Image | None = None
+        self._photo: ImageTk.PhotoImage | None = None
+
+    def _allocate(self, size: tuple[int, int]) -> None:
+        w, h = size
+        self.size = size
+        self._bgr = np.empty((h, w, 3), dtype=np.uint8)
+        self._rgba = np.empty((h, w, 4), dtype=np.uint8)
+        self._pil = Image.frombuffer("RGBA", size, self._rgba, "raw", "RGBA", 0, 1)
+        self._photo = ImageTk.PhotoImage(self._pil)
+        self.label.configure(image=self._photo)
+
+    def show(
+        self,
+        frame: MatLike,
+        size: tuple[int, int] | None = None,
+        smooth: bool = False
+    ) -> None:
+        """
+        Displays frame (BGR) at size (w, h), default: its own size.
+
+        Enlarged frames show their pixels as blocks, or are interpolated
+        when smooth (reduced-resolution video frames).
+        """
+
+        size = size or (frame.shape[1], frame.shape[0])
+        if size != self.size:
+            self._allocate(size)
+
+        if (frame.shape[1], frame.shape[0]) != size:
+            if size[0] < frame.shape[1]:
+                interpolation = cv2.INTER_AREA
+            else:
+                interpolation = cv2.INTER_LINEAR if smooth else cv2.INTER_NEAREST
+            frame = cv2.resize(frame, size, dst=self._bgr, interpolation=interpolation)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+        self._photo.paste(self._pil)
+
+
+def save_image(path: str, filters: Filters):
+    """
+    Saves the full-resolution render of the image at path, reusing the
+    cached render of these settings when there is one.
+    """
 
-
-class Filters:
-    def __init__(self):
-        self.selected: None | str = None
-
-        # region ----|1|---- Filter Params
-        self._params_defs = PARAMS_DEFS
-        self.params = {}
-
-        for filter_name in self._params_defs.keys():
-            param_registry = self._params_defs.get(filter_name, {})
-            self.params.setdefault(filter_name, {})
-            for param_name, cfg in param_registry.items():
-                self.params[filter_name][param_name] = cfg.default
-        # endregion -|1|-
-
-        # region ----|1|---- Define filters
-        self.filters: List[Callable] = (
-            original,
-            scanlines,
-            blur,
-            ca_linear,
-            ca_radial,
-            warp,
-            saturation,
-            warmth,
-            contrast,
-            vignette,
-            polaroid,
-            gamma,
-            noise,
-            posterize,
-            bit_depth,
-            downscale_resolution,
-            banding,
-            banding_luminance
-        )
-        self.t_filters: List[Callable] = ()
-        'Filters that work only with time'
-        # endregion -|1|-
-
-        # region ----|1|---- Map filters
-        self.filters_map: dict[str, FilterFn] = {
-            func.__name__: func
-            for func in self.filters
-        }
-        self.t_filters_map: dict[str, FilterFn] = {
-            func.__name__: func
-            for func in self.t_filters
-        }
-        self.all_filters_map: dict[str, FilterFn] = self.filters_map | self.t_filters_map
-        # endregion -|1|-
-
-    def set_param(
-            self,
-            filter_name: str,
-            param: str,
-            value: int
-        ) -> None:
-
-        cfg = self._params_defs[filter_name][param]
-
-        def resolve(v):
-            if callable(v):
-                return v(FRAME)
-            return v
-
-        min_v = resolve(cfg.min)
-        max_v = resolve(cfg.max)
-
-        self.params[filter_name][param] = max(min_v, min(max_v, value))
-
-    def apply_filter(self, frame: MatLike) -> MatLike:
-        filter_fn = self.all_filters_map[self.selected]
-        kwargs = self.params.get(self.selected)
-        if kwargs:
-            frame = filter_fn(frame, **kwargs)
-        else:
-            frame = filter_fn(frame)
-
-        return frame
-
-
-def mux_audio(
-    video_no_audio: str, # path
-    original_video: str, # path
-    output_path: str # path
-) -> None:
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i", video_no_audio,
-        "-i", original_video,
-        "-c:v", "copy",
-        "-c:a", "aac",
-        "-map", "0:v:0",
-        "-map", "1:a:0",
-        output_path
-    ]
-
-    subprocess.run(
-        cmd,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
-
-
-def save_image(img: MatLike, filters: Filters):
-    path = filedialog.asksaveasfilename(
+    output_path = filedialog.asksaveasfilename(
         title="Salvar imagem",
         defaultextension=".png",
         initialfile=f"{uuid.uuid4().hex}.png",
@@ -137,21 +156,22 @@ def save_image(img: MatLike, filters: Filters):
             ("Todos os arquivos", "*.*")
         ]
     )
+    if not output_path: return
 
-    img = filters.apply_filter(img)
-
-    cv2.imwrite(path, img)
+    source_key, source = imread_cached(path)
+    if source is None: return
 
+    h, w = source.shape[:2]
+    key = render_key(source_key, filters.selected, filters.scaled_params(), (0, h, 0, w))
 
-def save_video(input_path: str, filters: Filters):
-    cap = cv2.VideoCapture(input_path)
+    img = RENDER_CACHE.get(key)
+    if img is None:
+        img = RENDER_CACHE.put(key, filter_still(filters, source))
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cv2.imwrite(output_path, img)
 
-    fourcc = cv2.VideoWriter_fourcc('m','p','4','v')
 
+def save_video(input_path: str, filters: Filters):
     output_path = filedialog.asksaveasfilename(
         title="salvar video",
         defaultextension=".mp4",
@@ -162,36 +182,12 @@ def save_video(input_path: str, filters: Filters):
         ]
     )
 
-    temp_path = f"{uuid.uuid4().hex}.mp4"
-
-    writer = cv2.VideoWriter(
-        filename=temp_path,
-        fourcc=fourcc,
-        fps=fps,
-        frameSize=(w, h)
-    )
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = filters.apply_filter(frame)
-        writer.write(frame)
-
-    cap.release()
-    writer.release()
-
-    mux_audio(
-        video_no_audio=temp_path,
-        original_video=input_path,
-        output_path=output_path
+    render_video(
+        input_path=input_path,
+        output_path=output_path,
+        filters=filters
     )
 
-    # Delete temporary path
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
-
     messagebox.showinfo("Save", "Video Saved Successfully!")
 
 
@@ -257,6 +253,41 @@ class GUI:
         self.file_btn.pack(fill="x", padx=PADX, pady=PADY)
         # endregion -|1|-
 
+        # region ----|1|---- Proxy Preview
+        self.proxy_var = tk.BooleanVar(value=True)
+        'Preview from a display-sized decode, with pixel-size params rescaled'
+
+        self.proxy_check = tk.Checkbutton(
+            self.filter_frame,
+            text="Proxy preview",
+            variable=self.proxy_var,
+            command=self.toggle_proxy,
+            bg="lightgray"
+        )
+
+        self.proxy_check.pack(fill="x", padx=PADX, pady=PADY)
+        # endregion -|1|-
+
+        # region ----|1|---- Playback Stats
+        self.pause_btn = tk.Button(self.filter_frame, text="Pause", command=self.toggle_pause)
+
+        self.timeline_var = tk.IntVar(value=0)
+        self.timeline = tk.Scale(
+            self.filter_frame,
+            variable=self.timeline_var,
+            orient="horizontal",
+            showvalue=False,
+            bg="lightgray"
+        )
+        self._scrubbing = False
+        'The timeline follows playback except while dragged'
+
+        self.timeline.bind("<ButtonPress-1>", self.on_scrub_start)
+        self.timeline.bind("<B1-Motion>", self.on_scrub)
+        self.timeline.bind("<ButtonRelease-1>", self.on_scrub_end)
+        self.drop_label = tk.Label(self.filter_frame, text="", bg="lightgray")
+        # endregion -|1|-
+
         # region ----|1|---- Select Filter
         self.option_var = tk.StringVar(value="Select Filter")
 
@@ -279,9 +310,41 @@ class GUI:
         # endregion -|1|-
 
         # region ----|1|---- Midia
-        self.cap = None
-        self.tk_img = None
+        self.player: Player | None = None
+        'Decodes and filters the video on a worker thread, paced by its FPS'
+        self.player_filters: Filters | None = None
+        'Snapshot of the filters the player renders with, replaced on each change'
+        self.store: ProxyStore | None = None
+        'Decoded proxy frames of the video, built in the background'
+        self.display = PreviewDisplay(self.midia_label)
+        'Draws into one PhotoImage reused across frames'
         self.playing = False
+        self.preview_worker = PreviewWorker()
+        'Renders still previews off the Tk thread, newest request only'
+        self._preview_poll: str | None = None
+        # endregion -|1|-
+
+        # region ----|1|---- Viewport
+        self.proxy: MatLike | None = None
+        'Reduced decode of the image, when it covers the preview'
+        self.proxy_key: Hashable = None
+        self.frame_key: Hashable = None
+        'Source cache keys of the proxy and of FRAME'
+        self.proxy_scale = 1.0
+        'Size of the previewed frames relative to the source'
+
+        self.zoom = 1.0
+        '1 → whole image fits the preview'
+        self.view_center = (0.5, 0.5)
+        '(x, y) at the centre of the preview, as fractions of the image size'
+        self._drag: tuple[int, int, tuple[float, float]] | None = None
+
+        self.midia_label.bind("<MouseWheel>", self.on_zoom)
+        self.midia_label.bind("<Button-4>", self.on_zoom)
+        self.midia_label.bind("<Button-5>", self.on_zoom)
+        self.midia_label.bind("<ButtonPress-1>", self.on_pan_start)
+        self.midia_label.bind("<B1-Motion>", self.on_pan)
+        self.midia_label.bind("<Double-Button-1>", self.reset_view)
         # endregion -|1|-
 
     def select_file(self):
@@ -301,7 +364,33 @@ class GUI:
             self.option_combo.pack(padx=PADX, pady=PADY)
             self.params_frame.pack(fill="x", padx=PADX, pady=PADY)
 
+        self.zoom = 1.0
+        self.view_center = (0.5, 0.5)
+
+        # Stop the playback of a previous video
+        if self.player and file_path:
+            self.player.stop()
+            self.player = None
+            self.playing = False
+            self.pause_btn.pack_forget()
+            self.timeline.pack_forget()
+            self.drop_label.pack_forget()
+
+        # A build of another clip would only compete with this one
+        if self.store and file_path and self.store.source_path != file_path:
+            self.store.close()
+            self.store = None
+
         self.file_ext = os.path.splitext(file_path)[1].lower()
+
+        # Temporal filters only make sense on videos
+        self.option_combo.configure(
+            values=(
+                list(self.filters.all_filters_map)
+                if self.file_ext in VIDEO_EXTENSIONS
+                else list(self.filters.filters_map)
+            )
+        )
         if self.file_ext in IMAGE_EXTENSIONS:
             self.show_image(file_path)
         elif self.file_ext in VIDEO_EXTENSIONS:
@@ -311,69 +400,300 @@ class GUI:
 
     def show_image(self, path: str):
         global FRAME
-        FRAME = cv2.imread(path)
-        if FRAME is None: return
+        FRAME = None
+        self.proxy_key, self.proxy, self.proxy_scale = None, None, 1.0
+
+        if self.proxy_var.get():
+            display = (self.left_frame.winfo_width(), self.left_frame.winfo_height())
+            self.proxy_key, self.proxy, self.proxy_scale = read_proxy(path, display)
+
+        # Full size only when the proxy doesn't cover the view
+        if self.proxy is None and self.full_frame() is None: return
+
+        self.render_view()
+
+    def full_frame(self) -> MatLike | None:
+        'FRAME, decoded at full size on first use (through the source cache)'
+        global FRAME
+        if FRAME is None and self.selected_file:
+            self.frame_key, FRAME = imread_cached(self.selected_file)
+        return FRAME
+
+    def preview_source(self) -> tuple[Hashable, MatLike | None, float]:
+        """
+        Frame the preview renders from: the proxy while it has at least one
+        pixel per screen pixel at the current zoom, else the full image.
+
+        Returns:
+            (source key, frame, its scale relative to the source)
+        """
+
+        if self.proxy is not None:
+            h, w = self.proxy.shape[:2]
+            fit = min(self.left_frame.winfo_width() / w, self.left_frame.winfo_height() / h)
+            if fit * self.zoom <= 1:
+                return self.proxy_key, self.proxy, self.proxy_scale
 
-        if self.filters.selected:
-            FRAME = self.filters.apply_filter(FRAME)
+        frame = self.full_frame()
+        return self.frame_key, frame, 1.0
 
-        img: MatLike = cv2.cvtColor(FRAME, cv2.COLOR_BGR2RGB)
+    def viewport(self, shape: tuple[int, ...]) -> tuple[tuple[int, int, int, int], tuple[int, int], float]:
+        """
+        Visible part of a frame of the given shape at the current zoom/pan.
 
-        h, w = img.shape[:2]
+        Returns:
+            ((y0, y1, x0, x1) rect, (w, h) on screen, screen px per frame px)
+        """
+
+        h, w = shape[:2]
         frame_w = self.left_frame.winfo_width()
         frame_h = self.left_frame.winfo_height()
-        scale = min(frame_w / w, frame_h / h)
-
-        new_w = int(scale * w)
-        new_h = int(scale * h)
+        scale = min(frame_w / w, frame_h / h) * self.zoom
+
+        view_w = min(w, max(1, round(frame_w / scale)))
+        view_h = min(h, max(1, round(frame_h / scale)))
+
+        # Keep the view inside the image
+        cx, cy = self.view_center
+        x0 = int(min(max(0, cx * w - view_w / 2), w - view_w))
+        y0 = int(min(max(0, cy * h - view_h / 2), h - view_h))
+        self.view_center = ((x0 + view_w / 2) / w, (y0 + view_h / 2) / h)
+
+        size = (max(1, int(view_w * scale)), max(1, int(view_h * scale)))
+        return (y0, y0 + view_h, x0, x0 + view_w), size, scale
+
+    def render_view(self):
+        """
+        Shows the visible region of the image, filtered (plus what the
+        filter reads around it), so zoomed-in previews cost screen pixels
+        rather than source pixels.
+
+        Settings rendered before come from RENDER_CACHE at once; others
+        render on the preview worker, where newer requests supersede
+        older ones.
+        """
+
+        source_key, source, scale = self.preview_source()
+        if source is None: return
+
+        rect, size, _ = self.viewport(source.shape)
+        y0, y1, x0, x1 = rect
+
+        if not self.filters.selected:
+            self.preview_worker.cancel()
+            self.display.show(source[y0:y1, x0:x1], size)
+            return
+
+        # The key and the render both come from one snapshot, so a region
+        # is never cached under params it wasn't rendered with
+        filters = self.filters.snapshot()
+        key = render_key(source_key, filters.selected, filters.scaled_params(scale), rect, scale)
+        roi = RENDER_CACHE.get(key)
+        if roi is not None:
+            self.preview_worker.cancel()
+            self.display.show(roi, size)
+            return
+
+        self.preview_worker.submit(
+            lambda arena: render_preview(source, rect, size, filters, scale, key, arena)
+        )
+        if self._preview_poll is None:
+            self._preview_poll = self.root.after(10, self.poll_preview)
+
+    def poll_preview(self):
+        self._preview_poll = None
+
+        # Checked before take(): a render finishing in between is taken next time
+        busy = self.preview_worker.busy
+
+        img = self.preview_worker.take()
+        if img is not None:
+            self.display.show(img)
+
+        if busy:
+            self._preview_poll = self.root.after(10, self.poll_preview)
+
+    def on_zoom(self, event: tk.Event) -> None:
+        if self.playing: return
+        _, source, scale = self.preview_source()
+        if source is None: return
+
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        _, _, view_scale = self.viewport(source.shape)
+
+        # Deepest zoom is relative to the full-size source
+        fit = view_scale * scale / self.zoom
+        max_zoom = max(1.0, MAX_PIXEL_SCALE / fit)
+        zoom = self.zoom * ZOOM_STEP if zoom_in else self.zoom / ZOOM_STEP
+        zoom = min(max(1.0, zoom), max_zoom)
+
+        # Keep the point under the cursor in place
+        h, w = source.shape[:2]
+        dx = (event.x - self.midia_label.winfo_width() / 2) / view_scale
+        dy = (event.y - self.midia_label.winfo_height() / 2) / view_scale
+        cx, cy = self.view_center
+        px, py = cx + dx / w, cy + dy / h
+
+        ratio = self.zoom / zoom
+        self.zoom = zoom
+        self.view_center = (px - dx * ratio / w, py - dy * ratio / h)
+        self.render_view()
+
+    def on_pan_start(self, event: tk.Event) -> None:
+        self._drag = (event.x, event.y, self.view_center)
+
+    def on_pan(self, event: tk.Event) -> None:
+        if self.playing or self._drag is None: return
+        _, source, _ = self.preview_source()
+        if source is None: return
+
+        start_x, start_y, (cx, cy) = self._drag
+        _, _, view_scale = self.viewport(source.shape)
+        h, w = source.shape[:2]
+
+        self.view_center = (
+            cx - (event.x - start_x) / view_scale / w,
+            cy - (event.y - start_y) / view_scale / h
+        )
+        self.render_view()
 
-        if new_w > 1 and new_h > 1:
-            img_resized = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    def reset_view(self, event: tk.Event | None = None) -> None:
+        self.zoom = 1.0
+        self.view_center = (0.5, 0.5)
+        if not self.playing: self.render_view()
 
-        pil_img = Image.fromarray(img_resized)
-        self.tk_img = ImageTk.PhotoImage(pil_img)
+    def toggle_proxy(self) -> None:
+        if not self.selected_file: return
 
-        self.midia_label.configure(image=self.tk_img)
+        if self.file_ext in IMAGE_EXTENSIONS:
+            self.show_image(self.selected_file)
+        elif self.file_ext in VIDEO_EXTENSIONS:
+            self.show_video(self.selected_file)
 
     def show_video(self, path: str):
-        if self.cap: self.cap.release()
+        # Releases the previous capture
+        if self.player: self.player.stop()
+
+        cap = None
+        self.proxy_scale = 1.0
+
+        if self.proxy_var.get():
+            # Decoded and scaled to the preview size by ffmpeg
+            try:
+                probe = FFmpegPipeReader(path)
+                w, h = probe.source_size
+                probe.release()
+
+                fit = min(1.0, self.left_frame.winfo_width() / w, self.left_frame.winfo_height() / h)
+                size = (max(2, round(w * fit)), max(2, round(h * fit)))
+                self.proxy_scale = size[0] / w
+
+                # Played from the store as it fills; too long clips stream
+                self.store = proxy_store(path, size)
+                cap = self.store.capture() if self.store else FFmpegPipeReader(path, size)
+            except (FileNotFoundError, OSError):
+                cap = None
+
+        if cap is None:
+            cap = cv2.VideoCapture(path)
+
+        # Filtered at a lower resolution while frames miss their budget
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        adaptive = AdaptiveScale(budget=FRAME_BUDGET / fps)
+        self.filters.fps = fps
+        self.player_filters = None
+        self.update_player_filters()
+
+        self.player = Player(cap, self.render_video_frame, fps=fps, adaptive=adaptive)
+        self.player.start()
+        self.pause_btn.configure(text="Pause")
+        self.pause_btn.pack(fill="x", padx=PADX, pady=PADY)
+        if self.player.frame_count > 1:
+            self.timeline.configure(to=self.player.frame_count - 1)
+            self.timeline.pack(fill="x", padx=PADX, pady=PADY)
+        self.drop_label.pack(fill="x", padx=PADX, pady=PADY)
+
+        # An already running loop picks the new player up
+        if not self.playing:
+            self.playing = True
+            self.update_video()
+
+    def update_player_filters(self) -> None:
+        """
+        Hands the player a snapshot of the current filters; the Tk thread
+        never changes the one it is rendering with. A temporal filter keeps
+        its history across param changes, but not across filter switches.
+        """
+
+        filters = self.filters.snapshot()
+        previous = self.player_filters
+        if previous is not None and previous.selected == filters.selected:
+            filters.history = previous.history
+        self.player_filters = filters
+
+    def render_video_frame(self, frame: MatLike, index: int, arena: Arena, scale: float) -> MatLike:
+        'Runs on the playback worker thread; frame is already reduced by scale'
+        # Read once: the Tk thread may swap in a new snapshot meanwhile
+        filters = self.player_filters
+        if filters is None or not filters.selected:
+            return frame
+        return filters.apply_filter(frame, index, arena=arena, scale=self.proxy_scale * scale)
+
+    def toggle_pause(self) -> None:
+        if not self.player: return
+
+        if self.player.paused:
+            self.player.resume()
+            self.pause_btn.configure(text="Pause")
+        else:
+            # Refines the frame on screen to full resolution
+            self.player.pause()
+            self.pause_btn.configure(text="Play")
 
-        self.cap = cv2.VideoCapture(path)
-        self.playing = True
-        self.update_video()
+    def on_scrub_start(self, event: tk.Event) -> None:
+        self._scrubbing = True
 
-    def update_video(self):
-        global FRAME
-        if not self.playing or not self.cap: return
+    def on_scrub(self, event: tk.Event) -> None:
+        if self.player:
+            self.player.seek(self.timeline_var.get())
 
-        ret, FRAME = self.cap.read()
-        if not ret: # Resets the video loop
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, FRAME = self.cap.read()
-            if not ret: return
+    def on_scrub_end(self, event: tk.Event) -> None:
+        self.on_scrub(event)
+        self._scrubbing = False
 
-        if self.filters.selected:
-            FRAME= self.filters.apply_filter(FRAME)
+    def refresh_video(self) -> None:
+        'Renders later frames with the changed filters, and re-renders the paused one'
+        self.update_player_filters()
+        if self.player and self.player.paused:
+            self.player.refresh()
 
-        rgb_frame = cv2.cvtColor(FRAME, cv2.COLOR_BGR2RGB)
+    def update_video(self):
+        global FRAME
+        if not self.playing or not self.player: return
 
-        h, w = rgb_frame.shape[:2]
-        frame_w = self.left_frame.winfo_width()
-        frame_h = self.left_frame.winfo_height()
-        scale = min(frame_w / w, frame_h / h)
+        frame, delay = self.player.poll()
 
-        new_w = int(scale * w)
-        new_h = int(scale * h)
+        if frame is not None:
+            # The decoded frame: the shown one may be at a reduced scale
+            FRAME = self.player.source
 
-        if new_w > 1 and new_h > 1:
-            frame_resized = cv2.resize(rgb_frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            h, w = FRAME.shape[:2]
+            frame_w = self.left_frame.winfo_width()
+            frame_h = self.left_frame.winfo_height()
+            scale = min(frame_w / w, frame_h / h)
 
-        pil_frame = Image.fromarray(frame_resized)
-        self.tk_img = ImageTk.PhotoImage(pil_frame)
+            new_w = int(scale * w)
+            new_h = int(scale * h)
 
-        self.midia_label.configure(image=self.tk_img)
+            # Resized before the colour conversion, both into display buffers
+            self.display.show(frame, (new_w, new_h) if new_w > 1 and new_h > 1 else None, smooth=True)
+            self.drop_label.configure(
+                text=f"Dropped frames: {self.player.dropped} · Scale: {self.player.scale:.0%}"
+            )
+            if not self._scrubbing:
+                self.timeline_var.set(self.player.position)
 
-        self.root.after(5, self.update_video)
+        self.root.after(delay, self.update_video)
 
     def apply_filter(self, event: tk.Event) -> None:
         self.filters.selected = self.option_var.get()
@@ -392,11 +712,12 @@ class GUI:
             save_btn = tk.Button(
                 self.params_frame,
                 text="Save",
-                command=lambda: save_image(FRAME, self.filters)
+                command=lambda: save_image(self.selected_file, self.filters)
             )
         save_btn.pack(anchor='s')
 
-        if not self.playing: self.show_image(self.selected_file)
+        if self.playing: self.refresh_video()
+        else: self.render_view()
         self.params_frame.pack(fill="both")
 
     def build_filter_controls(self, filter_fn: Callable):
@@ -471,10 +792,11 @@ class GUI:
 
         int_var = tk.IntVar(name=entry["textvariable"])
 
-        self.filters.set_param(filter_name, param, value)
+        self.filters.set_param(filter_name, param, value, FRAME)
         new_value = self.filters.params[filter_name][param]
         int_var.set(new_value)
-        self.show_image(self.selected_file)
+        if self.playing: self.refresh_video()
+        else: self.render_view()
 
 
 def main():
@@ -0,0 +1,178 @@
+"""
+Out-of-core rendering of images too big to filter in memory.
+
+The output is rendered in horizontal bands (each band in strips on a
+thread pool, see tiling.render_rows) and streamed to a memory-mapped .npy
+or a tiled TIFF, so the working set is a few bands whatever the image
+size. Bands read their source through filters.region, with the halo or
+source box each filter needs, and filters that depend on the pixel
+position (warp, vignette, ...) get frame coordinates, so the result is the
+whole-frame filter's.
+
+The source stays on disk when it's a .npy (HxWx3 uint8, BGR) or an
+uncompressed TIFF; other images are decoded whole first. TIFF support
+needs the optional tifffile package.
+"""
+import os
+import cv2
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from cv2.typing import MatLike
+from typing import Any, Callable, Iterator, Mapping, Tuple
+from filters.region import REGION_KERNELS, Reader, array_reader
+from tiling import TILE_PIXELS, render_rows
+
+
+LARGE_IMAGE_EXTENSIONS = (".npy", ".tif", ".tiff")
+'Formats read and written band by band'
+BAND_PIXELS = 1 << 24
+'Target pixels per band (each band is split in strips of TILE_PIXELS)'
+TIFF_TILE = 256
+'Tile size of written TIFFs; bands are a multiple of it'
+
+
+def _tifffile():
+    try:
+        import tifffile
+    except ImportError:
+        raise RuntimeError("TIFF images need the tifffile package (pip install tifffile)") from None
+    return tifffile
+
+
+def open_source(path: str) -> Tuple[Reader, Tuple[int, int]]:
+    """
+    Opens an image for reading by rect.
+
+    Returns:
+        (reader of BGR uint8 rects, (h, w))
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".npy":
+        img = np.load(path, mmap_mode="r")
+        if img.ndim != 3 or img.shape[2] != 3 or img.dtype != np.uint8:
+            raise ValueError(f"Expected an HxWx3 uint8 array in {path}, got {img.shape}/{img.dtype}")
+        return array_reader(img), img.shape[:2]
+
+    if ext in (".tif", ".tiff"):
+        tifffile = _tifffile()
+        try:
+            img = tifffile.memmap(path, mode="r")
+        except ValueError:
+            # Compressed or tiled: not mappable, decoded whole
+            img = tifffile.imread(path)
+
+        if img.ndim != 3 or img.shape[2] < 3 or img.dtype != np.uint8:
+            raise ValueError(f"Expected an 8-bit RGB TIFF in {path}, got {img.shape}/{img.dtype}")
+
+        # TIFF is RGB; cv2 needs contiguous BGR
+        def read(rect):
+            return np.ascontiguousarray(img[rect[0]:rect[1], rect[2]:rect[3], 2::-1])
+        return read, img.shape[:2]
+
+    img = cv2.imread(path)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image: {path}")
+    return array_reader(img), img.shape[:2]
+
+
+def iter_bands(
+    read: Reader,
+    frame_shape: Tuple[int, int],
+    name: str,
+    fn: Callable[..., MatLike],
+    params: Mapping[str, Any],
+    rng: np.random.Generator | None = None,
+    band_rows: int | None = None,
+    workers: int | None = None
+) -> Iterator[Tuple[int, MatLike]]:
+    """
+    Yields (first row, band) of the filtered frame, top to bottom.
+
+    The band buffer is reused: consume it before asking for the next one.
+    """
+
+    kernel = REGION_KERNELS.get(name)
+    if kernel is None:
+        raise ValueError(f"Filter '{name}' needs the whole frame and can't be rendered out of core")
+
+    h, w = frame_shape
+    band_rows = band_rows or max(TIFF_TILE, BAND_PIXELS // w // TIFF_TILE * TIFF_TILE)
+    tile_rows = max(1, min(band_rows, TILE_PIXELS // w))
+
+    # Per-frame state (noise's field), drawn once
+    state = kernel.prepare(frame_shape, params, rng)
+    band = np.empty((band_rows, w, 3), dtype=np.uint8)
+    local = threading.local()
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for y0 in range(0, h, band_rows):
+            y1 = min(h, y0 + band_rows)
+            render_rows(
+                pool, name, fn, params, read, frame_shape, y0, y1,
+                state, band[:y1 - y0], tile_rows, local
+            )
+            yield y0, band[:y1 - y0]
+
+
+def write_npy(path: str, frame_shape: Tuple[int, int], bands: Iterator[Tuple[int, MatLike]]) -> None:
+    h, w = frame_shape
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(h, w, 3))
+    for y0, band in bands:
+        out[y0:y0 + len(band)] = band
+    out.flush()
+
+
+def write_tiff(path: str, frame_shape: Tuple[int, int], bands: Iterator[Tuple[int, MatLike]]) -> None:
+    tifffile = _tifffile()
+    h, w = frame_shape
+
+    def tiles() -> Iterator[MatLike]:
+        # Bands are whole rows of tiles; tifffile pads the edge tiles
+        for _, band in bands:
+            for ty in range(0, len(band), TIFF_TILE):
+                for tx in range(0, w, TIFF_TILE):
+                    yield band[ty:ty + TIFF_TILE, tx:tx + TIFF_TILE, ::-1]
+
+    tifffile.imwrite(
+        path,
+        tiles(),
+        shape=(h, w, 3),
+        dtype=np.uint8,
+        tile=(TIFF_TILE, TIFF_TILE),
+        photometric="rgb",
+        bigtiff=h * w * 3 >= 1 << 32
+    )
+
+
+def render_banded(
+    input_path: str,
+    output_path: str,
+    name: str,
+    fn: Callable[..., MatLike],
+    params: Mapping[str, Any],
+    rng: np.random.Generator | None = None,
+    band_rows: int | None = None,
+    workers: int | None = None
+) -> None:
+    """
+    Filters an image band by band into a .npy, .tif or .tiff output.
+    """
+
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext not in LARGE_IMAGE_EXTENSIONS:
+        raise ValueError(f"Out-of-core output must be one of {LARGE_IMAGE_EXTENSIONS}, got {output_path}")
+
+    # TIFF tiles never straddle two bands
+    if ext != ".npy" and band_rows:
+        band_rows = -(-band_rows // TIFF_TILE) * TIFF_TILE
+
+    read, frame_shape = open_source(input_path)
+    bands = iter_bands(read, frame_shape, name, fn, params, rng, band_rows, workers)
+
+    if ext == ".npy":
+        write_npy(output_path, frame_shape, bands)
+    else:
+        write_tiff(output_path, frame_shape, bands)
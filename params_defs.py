@@ -11,6 +11,25 @@ class ParamDef:
     max: int | Callable[[MatLike], int]
     step: int = 1
     ui: str = "scale"
+    rescale: Callable[[int, float], int] | None = None
+    '(value, factor) → value for the frame resized by factor; for params with a size in pixels'
+
+
+def scale_length(value: int, factor: float) -> int:
+    'A length in pixels'
+    return round(value * factor)
+
+
+def scale_noise_axis(value: int, factor: float) -> int:
+    'noise x/y: the blur sigma is (101 - value) pixels; 0 stays off'
+    if value == 0:
+        return 0
+    return 101 - round((101 - value) * factor)
+
+
+def scale_percent(value: int, factor: float) -> int:
+    'downscale_resolution: blocks are 100 / value pixels wide'
+    return round(value / factor)
 
 
 ParamName: TypeAlias = str
@@ -31,7 +50,8 @@ PARAMS_DEFS: FilterParamRegistry = {
         "spacing": ParamDef(
             default=2,
             min=1,
-            max=lambda frame: frame.shape[0]
+            max=lambda frame: frame.shape[0],
+            rescale=scale_length
         )
     },
 
@@ -39,7 +59,13 @@ PARAMS_DEFS: FilterParamRegistry = {
         "blur_intensity": ParamDef(
             default=1,
             min=0,
-            max=50
+            max=50,
+            rescale=scale_length
+        ),
+        "fast": ParamDef(
+            default=0,
+            min=0,
+            max=1
         )
     },
 
@@ -47,17 +73,20 @@ PARAMS_DEFS: FilterParamRegistry = {
         "shift_r": ParamDef(
             default=5,
             min=-50,
-            max=50
+            max=50,
+            rescale=scale_length
         ),
         "shift_g": ParamDef(
             default=0,
             min=-50,
-            max=50
+            max=50,
+            rescale=scale_length
         ),
         "shift_b": ParamDef(
             default=-5,
             min=-50,
-            max=50
+            max=50,
+            rescale=scale_length
         )
     },
 
@@ -119,6 +148,8 @@ PARAMS_DEFS: FilterParamRegistry = {
         )
     },
 
+    "crt": {},
+
     "gamma": {
         "gamma": ParamDef(
             default=100,
@@ -131,12 +162,14 @@ PARAMS_DEFS: FilterParamRegistry = {
         "x_noise": ParamDef(
             default=10,
             min=0,
-            max=100
+            max=100,
+            rescale=scale_noise_axis
         ),
         "y_noise": ParamDef(
             default=10,
             min=0,
-            max=100
+            max=100,
+            rescale=scale_noise_axis
         ),
         "intensity": ParamDef(
             default=20,
@@ -165,7 +198,8 @@ PARAMS_DEFS: FilterParamRegistry = {
         "scale_percent": ParamDef(
             default=50,
             min=1,
-            max=100
+            max=100,
+            rescale=scale_percent
         )
     },
 
@@ -183,5 +217,65 @@ PARAMS_DEFS: FilterParamRegistry = {
             min=2,
             max=256
         )
+    },
+
+    "vhs_tracking": {
+        "jitter": ParamDef(
+            default=2,
+            min=0,
+            max=20,
+            rescale=scale_length
+        ),
+        "band": ParamDef(
+            default=10,
+            min=0,
+            max=50
+        ),
+        "speed": ParamDef(
+            default=25,
+            min=0,
+            max=100
+        )
+    },
+
+    "vhs_bleed": {
+        "bleed": ParamDef(
+            default=4,
+            min=0,
+            max=30,
+            rescale=scale_length
+        ),
+        "lag": ParamDef(
+            default=30,
+            min=0,
+            max=95
+        )
+    },
+
+    "vhs_ghosting": {
+        "ghost": ParamDef(
+            default=6,
+            min=0,
+            max=50,
+            rescale=scale_length
+        ),
+        "ghost_strength": ParamDef(
+            default=25,
+            min=0,
+            max=100
+        ),
+        "trails": ParamDef(
+            default=40,
+            min=0,
+            max=95
+        )
+    },
+
+    "vhs_blend": {
+        "frames": ParamDef(
+            default=3,
+            min=1,
+            max=16
+        )
     }
 }
\ No newline at end of file
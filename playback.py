@@ -0,0 +1,364 @@
+"""
+Real-time playback of filtered video for the preview.
+
+A background thread decodes and filters frames into a small queue; the UI
+thread only presents them, on a schedule taken from the source FPS and
+the wall clock. Frames that can't make their slot are dropped (skipped
+before filtering when the worker falls behind, or discarded when the UI
+does), so slow filters play at the source's speed at a lower frame rate
+instead of in slow motion.
+
+With an AdaptiveScale, frames are also filtered at a reduced resolution
+whenever the recent ones took longer than the frame budget, and back at
+full resolution once there's headroom. Pausing re-renders the frame on
+screen at full resolution.
+"""
+import cv2
+import math
+import time
+import queue
+import threading
+from cv2.typing import MatLike
+from typing import Any, Callable, Tuple
+from filters.arena import Arena
+
+
+RenderFn = Callable[[MatLike, int, Arena, float], MatLike]
+'(frame, frame_index, arena, scale) -> filtered frame; frame is already resized by scale'
+
+
+class AdaptiveScale:
+    """
+    Processing scale of preview frames, steered by how long they take.
+
+    The cost of a frame goes roughly with its pixels, so the scale that
+    fits the budget is scale * sqrt(budget / time) for a smoothed recent
+    time. It moves on a few fixed steps, since every new frame size builds
+    new filter plans: down as soon as frames are over budget, up only when
+    the next step would still fit with some margin.
+    """
+
+    STEPS = (0.25, 0.35, 0.5, 0.7, 1.0)
+    HEADROOM = 1.2
+    'Predicted time at the next step up must be this far under budget'
+
+    def __init__(self, budget: float, smoothing: float = 0.3):
+        """
+        Parameters:
+            budget    : target seconds per frame
+            smoothing : weight of the newest time in the running average
+        """
+
+        self.budget = budget
+        self.smoothing = smoothing
+        self.level = len(self.STEPS) - 1
+        self._average: float | None = None
+
+    @property
+    def scale(self) -> float:
+        return self.STEPS[self.level]
+
+    def update(self, elapsed: float) -> float:
+        """
+        Records the time of a frame rendered at the current scale.
+
+        Returns:
+            the scale for the next frame
+        """
+
+        if self._average is None:
+            self._average = elapsed
+        else:
+            self._average += self.smoothing * (elapsed - self._average)
+
+        scale = self.scale
+        ideal = scale * math.sqrt(self.budget / max(self._average, 1e-6))
+        level = self.level
+
+        if ideal < scale:
+            while level > 0 and self.STEPS[level] > ideal:
+                level -= 1
+        elif level + 1 < len(self.STEPS) and ideal >= self.STEPS[level + 1] * math.sqrt(self.HEADROOM):
+            level += 1
+
+        if level != self.level:
+            # Expected time at the new scale, until new frames come in
+            self._average *= (self.STEPS[level] / scale) ** 2
+            self.level = level
+
+        return self.scale
+
+    def reset(self) -> None:
+        self.level = len(self.STEPS) - 1
+        self._average = None
+
+
+class Player:
+    def __init__(
+        self,
+        cap: Any,
+        render: RenderFn,
+        fps: float | None = None,
+        queue_size: int = 3,
+        loop: bool = True,
+        adaptive: AdaptiveScale | None = None
+    ):
+        """
+        Parameters:
+            cap        : cv2.VideoCapture-like source, used only by the worker
+            render     : filters a decoded frame (on the worker thread)
+            fps        : presentation rate (default: the source's CAP_PROP_FPS)
+            queue_size : frames decoded ahead
+            loop       : restart from the first frame at the end
+            adaptive   : lowers the processing resolution to hold its budget
+                         (default: always full resolution)
+        """
+
+        self.cap = cap
+        self.render = render
+        self.fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.period = 1.0 / self.fps
+        self.loop = loop
+        self.adaptive = adaptive
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        self.source: MatLike | None = None
+        'Decoded frame behind the last frame poll() returned'
+        self.position = 0
+        'Index in the clip of that frame'
+        self._shown: Tuple[MatLike, int] | None = None
+        self._refine: Tuple[MatLike, int] | None = None
+        'Frame to re-render at full resolution while paused'
+        self._seek: int | None = None
+        self._generation = 0
+        'Bumped by seeks and resumes; frames queued before are stale'
+        self._paused = threading.Event()
+        self._wake = threading.Event()
+
+        self._skipped = 0
+        self._discarded = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._pending: Tuple[int, float, MatLike, MatLike, int] | None = None
+        self._still: Tuple[MatLike, MatLike, int] | None = None
+        self._stop = threading.Event()
+        self._start = 0.0
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    @property
+    def dropped(self) -> int:
+        'Frames skipped so far to keep up with the clock'
+        return self._skipped + self._discarded
+
+    def start(self) -> None:
+        self._start = time.monotonic()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    @property
+    def scale(self) -> float:
+        'Current processing scale (paused frames are refined to full)'
+        if self._paused.is_set() or not self.adaptive:
+            return 1.0
+        return self.adaptive.scale
+
+    @property
+    def paused(self) -> bool:
+        return self._paused.is_set()
+
+    def pause(self) -> None:
+        'Stops on the frame shown and refines it to full resolution'
+        self._still = None
+        self._paused.set()
+        self.refresh()
+
+    def refresh(self) -> None:
+        'While paused, re-renders the frame shown (e.g. after a param change)'
+        if self._shown is not None:
+            self._refine = self._shown
+            self._wake.set()
+
+    def resume(self) -> None:
+        # Frames decoded before the pause are out of date
+        self._generation += 1
+        self._still = None
+        self._paused.clear()
+        self._wake.set()
+
+    def seek(self, index: int) -> None:
+        """
+        Continues playback (or the paused frame, refined) from frame index.
+        Exact and instant on a proxy store; other sources seek as
+        cv2.VideoCapture does.
+        """
+
+        self._generation += 1
+        self._seek = index
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+        # Unblock a worker waiting on a full queue
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.cap.release()
+
+    def _work(self) -> None:
+        try:
+            self._decode_loop()
+        except BaseException as e:
+            # Re-raised on the UI thread by poll()
+            self._error = e
+
+    def _render(self, frame: MatLike, index: int, arena: Arena, scale: float) -> MatLike:
+        if scale < 1.0:
+            h, w = frame.shape[:2]
+            size = (max(2, round(w * scale)), max(2, round(h * scale)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return self.render(frame, index, arena, scale)
+
+    def _decode_loop(self) -> None:
+        arena = Arena()
+        count = 0
+        'Frames since the clock start (or the last loop)'
+        position = 0
+        'Index in the clip of the next frame read'
+
+        while not self._stop.is_set():
+            seek, self._seek = self._seek, None
+            if seek is not None:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, seek)
+                position = seek
+                count = 0
+                self._start = time.monotonic()
+
+                # Paused: the frame sought is shown, refined
+                if self._paused.is_set():
+                    ok, frame = self.cap.read()
+                    if ok:
+                        self._refine = (frame, position)
+                        position += 1
+                        count = 1
+
+            if self._paused.is_set():
+                refine, self._refine = self._refine, None
+                if refine is not None:
+                    self._still = (self._render(*refine, arena, 1.0), *refine)
+
+                if self._seek is None and self._refine is None:
+                    self._wake.wait()
+                    self._wake.clear()
+
+                # Resumed: the clock restarts from the next frame
+                if not self._paused.is_set():
+                    self._start = time.monotonic() - count * self.period
+                continue
+
+            generation = self._generation
+            due = self._start + count * self.period
+            started = time.perf_counter()
+
+            # Already late by a whole frame: skip it without decoding
+            if time.monotonic() > due + self.period:
+                ok, frame = self.cap.grab(), None
+            else:
+                ok, frame = self.cap.read()
+
+            if not ok:
+                if not self.loop or position == 0:
+                    break
+
+                # The first frame follows the last one on the same timeline
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self._start = due
+                count = 0
+                position = 0
+                continue
+
+            index = position
+            position += 1
+            count += 1
+
+            if frame is None:
+                self._skipped += 1
+                continue
+
+            source = frame
+            frame = self._render(source, index, arena, self.scale)
+            if self.adaptive:
+                self.adaptive.update(time.perf_counter() - started)
+
+            # Waits while the queue is full; the UI drains it on schedule.
+            # Pausing or seeking drops the frame
+            while (
+                not self._stop.is_set()
+                and not self._paused.is_set()
+                and self._seek is None
+            ):
+                try:
+                    self._queue.put((generation, due, frame, source, index), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def poll(self) -> Tuple[MatLike | None, int]:
+        """
+        Called by the UI thread.
+
+        Returns:
+            (frame to show now or None, ms until the next poll is due)
+        """
+
+        if self._error is not None:
+            raise RuntimeError("Playback worker failed") from self._error
+
+        if self._paused.is_set():
+            still, self._still = self._still, None
+            if still is None:
+                return None, 50
+
+            frame, *shown = still
+            return self._present(frame, tuple(shown)), 50
+
+        frame = None
+        shown = None
+        now = time.monotonic()
+
+        while True:
+            item = self._pending
+            self._pending = None
+            if item is None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            generation, due, candidate, source, index = item
+            if generation != self._generation:
+                continue
+
+            if due > now:
+                self._pending = item
+                return self._present(frame, shown), max(1, int((due - now) * 1000))
+
+            # Missed its slot: show the newest due frame, drop older ones
+            if frame is not None:
+                self._discarded += 1
+            frame, shown = candidate, (source, index)
+
+        return self._present(frame, shown), max(1, int(self.period * 1000 / 2))
+
+    def _present(self, frame: MatLike | None, shown: Tuple[MatLike, int] | None) -> MatLike | None:
+        if frame is not None:
+            self._shown = shown
+            self.source, self.position = shown
+        return frame
@@ -0,0 +1,111 @@
+"""
+Background rendering of still previews.
+
+Parameter clicks, zooms and pans each submit a render; a single worker
+thread runs them, newest first. A request that hasn't started yet is
+replaced by the next one, and a render superseded while it ran is thrown
+away, so bursts of input cost at most one stale render and only the
+newest state is ever drawn.
+"""
+import threading
+from typing import Any, Callable, Tuple
+from filters.arena import Arena
+
+
+RenderJob = Callable[[Arena], Any]
+'Renders on the worker thread, with the worker\'s arena'
+
+
+class PreviewWorker:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._job: Tuple[int, RenderJob] | None = None
+        self._generation = 0
+        'Generation of the newest submitted request'
+        self._running = False
+        self._result: Tuple[int, Any] | None = None
+        self._error: BaseException | None = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, job: RenderJob) -> int:
+        """
+        Queues job, replacing any request that hasn't started.
+
+        Returns:
+            the request's generation
+        """
+
+        with self._cond:
+            self._generation += 1
+            self._job = (self._generation, job)
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self) -> None:
+        'Drops the queued request and the result of the one rendering'
+        with self._cond:
+            self._generation += 1
+            self._job = None
+            self._result = None
+
+    @property
+    def busy(self) -> bool:
+        'A request is queued or rendering'
+        with self._cond:
+            return self._job is not None or self._running
+
+    def take(self) -> Any | None:
+        """
+        The newest request's result, once (None until it's done, or when
+        it was superseded).
+        """
+
+        with self._cond:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise RuntimeError("Preview render failed") from error
+
+            if self._result is None:
+                return None
+
+            generation, result = self._result
+            self._result = None
+            return result if generation == self._generation else None
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._job = None
+            self._cond.notify()
+        self._thread.join()
+
+    def _work(self) -> None:
+        arena = Arena()
+
+        while True:
+            with self._cond:
+                while self._job is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+                generation, job = self._job
+                self._job = None
+                self._running = True
+
+            try:
+                result = job(arena)
+            except BaseException as e:
+                with self._cond:
+                    self._running = False
+                    self._error = e
+                continue
+
+            with self._cond:
+                self._running = False
+                # Superseded while rendering: never drawn
+                if generation == self._generation:
+                    self._result = (generation, result)
@@ -0,0 +1,263 @@
+"""
+Decoded proxies of videos, for playback and scrubbing without decoding.
+
+A ProxyStore decodes a clip once, on a background thread, into downscaled
+BGR frames in a memory-mapped .npy (frames x h x w x 3 uint8) next to a
+small JSON index. Any frame is then a slice of the map: looping and
+seeking cost nothing and are exact, and previewing other filters on the
+same clip (in this session or a later one) never decodes it again.
+
+Stores live in the temp directory, keyed on the source file (path, mtime,
+size) and the proxy size; the least recently used are deleted past
+STORE_DIR_BYTES.
+"""
+import os
+import cv2
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+from cv2.typing import MatLike
+from typing import Dict, Hashable, Tuple
+from cache import source_key
+from export import FFmpegPipeReader
+
+
+STORE_DIR = os.path.join(tempfile.gettempdir(), "midiafilt-proxies")
+STORE_DIR_BYTES = 8 * 1024 * 1024 * 1024
+'Disk budget of all stores'
+MAX_STORE_BYTES = 2 * 1024 * 1024 * 1024
+'Longer clips (at their proxy size) are played from the decoder instead'
+
+
+class ProxyStore:
+    def __init__(self, path: str, frame_size: Tuple[int, int]):
+        """
+        Opens the finished store of (path, frame_size), or starts building
+        it. Use proxy_store() to share stores across players.
+
+        Parameters:
+            frame_size : (w, h) of the proxy frames
+        """
+
+        self.source_path = path
+        self.frame_size = tuple(frame_size)
+
+        key = repr((source_key(path), self.frame_size)).encode()
+        name = hashlib.sha1(key).hexdigest()[:20]
+        self.path = os.path.join(STORE_DIR, name + ".npy")
+        self.index_path = os.path.join(STORE_DIR, name + ".json")
+
+        self._cond = threading.Condition()
+        self._cancel = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.error: BaseException | None = None
+
+        index = self._load_index()
+        if index is not None:
+            self.fps = index["fps"]
+            self.count = index["frames"]
+            'Frames decoded so far'
+            self.done = True
+            self.frames = np.load(self.path, mmap_mode="r")
+            # Marks it recently used for eviction
+            os.utime(self.index_path)
+            return
+
+        reader = FFmpegPipeReader(path, self.frame_size)
+        self.fps = reader.fps
+        self.count = 0
+        self.done = False
+        capacity = max(1, reader.frame_count)
+
+        w, h = self.frame_size
+        os.makedirs(STORE_DIR, exist_ok=True)
+        _evict(STORE_DIR_BYTES - capacity * w * h * 3)
+
+        self._writable = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=np.uint8, shape=(capacity, h, w, 3)
+        )
+        self.frames = self._writable.view()
+        self.frames.flags.writeable = False
+
+        self._thread = threading.Thread(target=self._build, args=(reader,), daemon=True)
+        self._thread.start()
+
+    @property
+    def frame_count(self) -> int:
+        'Frames in the clip (expected, until the store is done)'
+        return self.count if self.done else len(self.frames)
+
+    def _load_index(self) -> dict | None:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not os.path.exists(self.path):
+            return None
+        return index
+
+    def _build(self, reader: FFmpegPipeReader) -> None:
+        try:
+            # Decoded straight into the map
+            while self.count < len(self._writable) and not self._cancel.is_set():
+                ok, _ = reader.read(self._writable[self.count])
+                if not ok:
+                    break
+                with self._cond:
+                    self.count += 1
+                    self._cond.notify_all()
+
+            if not self._cancel.is_set():
+                self._writable.flush()
+                # Written last: a store without an index is never reused
+                tmp = self.index_path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump({"fps": self.fps, "frames": self.count, "size": self.frame_size}, f)
+                os.replace(tmp, self.index_path)
+        except BaseException as e:
+            self.error = e
+        finally:
+            reader.release()
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def frame(self, index: int, wait: bool = True) -> MatLike | None:
+        """
+        Read-only view of a frame.
+
+        Returns:
+            the frame, or None past the end of the clip (or, when not
+            waiting, while it isn't decoded yet)
+        """
+
+        with self._cond:
+            while index >= self.count and not self.done:
+                if not wait:
+                    return None
+                self._cond.wait()
+
+            if self.error is not None:
+                raise RuntimeError(f"Could not decode {self.source_path}") from self.error
+            if index >= self.count:
+                return None
+        return self.frames[index]
+
+    def capture(self) -> "ProxyCapture":
+        return ProxyCapture(self)
+
+    def close(self) -> None:
+        'Stops an unfinished build and deletes its partial store'
+        if self._thread is None:
+            return
+
+        self._cancel.set()
+        self._thread.join()
+        self._thread = None
+
+        if not os.path.exists(self.index_path):
+            self.frames = self._writable = None
+            os.remove(self.path)
+
+
+class ProxyCapture:
+    """
+    cv2.VideoCapture-like reader of a ProxyStore. Frames are read-only
+    views of the store; seeking (CAP_PROP_POS_FRAMES) is exact and free.
+    """
+
+    def __init__(self, store: ProxyStore):
+        self.store = store
+        self._pos = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self) -> Tuple[bool, MatLike | None]:
+        frame = self.store.frame(self._pos)
+        if frame is None:
+            return False, None
+        self._pos += 1
+        return True, frame
+
+    def grab(self) -> bool:
+        return self.read()[0]
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FPS: self.store.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.store.frame_count,
+            cv2.CAP_PROP_FRAME_WIDTH: self.store.frame_size[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: self.store.frame_size[1],
+            cv2.CAP_PROP_POS_FRAMES: self._pos
+        }.get(prop, 0.0)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self._pos = max(0, int(value))
+        return True
+
+    def release(self) -> None:
+        'The store stays open for the next player'
+
+
+_STORES: Dict[Tuple[Hashable, Tuple[int, int]], ProxyStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def proxy_store(path: str, frame_size: Tuple[int, int]) -> ProxyStore | None:
+    """
+    The store of (path, frame_size), shared by every caller in the process.
+
+    Returns:
+        the store, or None when the clip is too long for MAX_STORE_BYTES
+    """
+
+    key = (source_key(path), tuple(frame_size))
+
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is not None and store.frames is not None and store.error is None:
+            return store
+
+        probe = cv2.VideoCapture(path)
+        frames = int(probe.get(cv2.CAP_PROP_FRAME_COUNT))
+        probe.release()
+
+        # Unknown lengths can't be allocated up front
+        w, h = frame_size
+        if frames <= 0 or frames * w * h * 3 > MAX_STORE_BYTES:
+            return None
+
+        store = _STORES[key] = ProxyStore(path, frame_size)
+        return store
+
+
+def _evict(budget: int) -> None:
+    'Deletes the least recently used stores until the rest fit in budget'
+    stores = []
+    for entry in os.scandir(STORE_DIR):
+        if entry.name.endswith(".npy"):
+            index = entry.path[:-4] + ".json"
+            used = os.path.getmtime(index) if os.path.exists(index) else 0.0
+            stores.append((used, entry.path, entry.stat().st_size))
+
+    total = sum(size for _, _, size in stores)
+    open_paths = {store.path for store in _STORES.values()}
+
+    for _, path, size in sorted(stores):
+        if total <= budget:
+            break
+        if path in open_paths:
+            continue
+        for p in (path, path[:-4] + ".json"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+        total -= size
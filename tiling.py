@@ -0,0 +1,118 @@
+"""
+Tiled rendering of large still images.
+
+The frame is cut into horizontal strips that a thread pool renders through
+filters.region, each strip reading only the source rows it depends on
+(plus a halo for blur, or the source box of a remap). Strips are written
+straight into the output, so the result is the whole-frame filter's,
+computed on every core with cache-sized temporaries.
+"""
+import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from cv2.typing import MatLike
+from typing import Any, Callable, List, Mapping
+from filters.arena import Arena, output
+from filters.plan import Rect
+from filters.region import REGION_KERNELS, Reader, array_reader, render_region
+
+
+TILE_PIXELS = 1 << 20
+'Target pixels per strip'
+
+
+def strip_rects(frame_shape: tuple[int, ...], rows: int, y0: int = 0, y1: int | None = None) -> List[Rect]:
+    'Full-width strips of `rows` rows covering rows [y0, y1) of the frame'
+    h, w = frame_shape[:2]
+    y1 = h if y1 is None else y1
+    return [(y, min(y1, y + rows), 0, w) for y in range(y0, y1, rows)]
+
+
+def default_tile_rows(frame_shape: tuple[int, ...]) -> int:
+    return max(1, TILE_PIXELS // frame_shape[1])
+
+
+def render_rows(
+    pool: ThreadPoolExecutor,
+    name: str,
+    fn: Callable[..., MatLike],
+    params: Mapping[str, Any],
+    read: Reader,
+    frame_shape: tuple[int, ...],
+    y0: int,
+    y1: int,
+    state: Any,
+    out: MatLike,
+    tile_rows: int | None = None,
+    local: threading.local | None = None
+) -> MatLike:
+    """
+    Renders rows [y0, y1) of the filtered frame into out (y1 - y0 rows),
+    in strips on pool. state is REGION_KERNELS[name].prepare() of the frame.
+
+    local holds one arena per pool thread; pass the same one to successive
+    calls to keep the arenas.
+    """
+
+    frame_shape = tuple(frame_shape[:2])
+    tile_rows = tile_rows or default_tile_rows(frame_shape)
+
+    # One arena per thread, reused by every strip the thread renders
+    local = local or threading.local()
+
+    def render(rect: Rect) -> None:
+        arena = getattr(local, "arena", None)
+        if arena is None:
+            arena = local.arena = Arena()
+
+        render_region(
+            name, fn, params, read, frame_shape, rect,
+            state=state, out=out[rect[0] - y0:rect[1] - y0], arena=arena
+        )
+
+    # list() re-raises the first strip error, if any
+    list(pool.map(render, strip_rects(frame_shape, tile_rows, y0, y1)))
+    return out
+
+
+def render_tiled(
+    img: MatLike,
+    name: str,
+    fn: Callable[..., MatLike],
+    params: Mapping[str, Any],
+    rng: np.random.Generator | None = None,
+    workers: int | None = None,
+    tile_rows: int | None = None,
+    out: MatLike | None = None
+) -> MatLike:
+    """
+    Applies a filter to img strip by strip on a thread pool.
+
+    Filters without a region kernel (see filters.region) run on the whole
+    frame instead.
+
+    Parameters:
+        name, fn, params : the filter
+        rng              : generator for random filters (drawn from once,
+                           for the whole frame)
+        workers          : threads (default: CPU count)
+        tile_rows        : rows per strip (default: about TILE_PIXELS pixels)
+    """
+
+    out = output(out, img)
+    kernel = REGION_KERNELS.get(name)
+
+    if kernel is None:
+        kwargs = dict(params)
+        if rng is not None:
+            kwargs["rng"] = rng
+        return fn(img, **kwargs, out=out)
+
+    h = img.shape[0]
+    state = kernel.prepare(img.shape[:2], params, rng)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        render_rows(pool, name, fn, params, array_reader(img), img.shape, 0, h, state, out, tile_rows)
+
+    return out